@@ -0,0 +1,61 @@
+"""
+Helpers for Anthropic prompt caching.
+
+The API caches prefixes in the order tools -> system -> messages and allows at
+most four cache_control breakpoints per request. The agents use them for the
+tool list, the system prompt, the stable session context (first block of the
+first user message) and the newest message, so that the whole history of the
+previous call is a cache hit on the next one.
+"""
+
+from typing import Any, Dict, List
+from anthropic.types import MessageParam, TextBlockParam, ToolUnionParam
+from backend.core.metrics import record_usage
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_CONTROL: Dict[str, str] = {"type": "ephemeral"}
+
+
+def cached_system(system_prompt: str) -> List[TextBlockParam]:
+    block: Any = {"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL}
+    return [block]
+
+
+def cached_tools(tools: List[ToolUnionParam]) -> List[ToolUnionParam]:
+    """Copy of tools with a breakpoint after the last definition"""
+    if not tools:
+        return tools
+    return [*tools[:-1], {**tools[-1], "cache_control": CACHE_CONTROL}]  # type: ignore[list-item]
+
+
+def with_cache_breakpoints(messages: List[MessageParam]) -> List[MessageParam]:
+    """Copy of messages with breakpoints on the stable context and on the newest block"""
+    if not messages:
+        return messages
+
+    marked: List[Any] = list(messages)
+    last = len(marked) - 1
+    for index, block_index in ((0, 0), (last, -1)):
+        message = marked[index]
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        content = list(content)
+        content[block_index] = {**content[block_index], "cache_control": CACHE_CONTROL}
+        marked[index] = {**message, "content": content}
+    return marked
+
+
+def log_usage(agent: str, model: str, usage: Any) -> None:
+    """Log and count token usage of one messages call, including cache reads and writes"""
+    record_usage(agent=agent, model=model, usage=usage)
+    logger.info(
+        "Token usage: agent=%s, input=%s, output=%s, cache_read=%s, cache_creation=%s",
+        agent,
+        usage.input_tokens,
+        usage.output_tokens,
+        getattr(usage, "cache_read_input_tokens", None) or 0,
+        getattr(usage, "cache_creation_input_tokens", None) or 0,
+    )
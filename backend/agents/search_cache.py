@@ -0,0 +1,104 @@
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict
+from backend.core.cache import TTLCache
+from backend.core.database import database
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+from backend.models.search_cache_model import WebSearchCacheModel
+from backend.schemas.assistant_schemas import WebSearchResponse
+
+logger = get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n\"'`.,!?。、！？"
+
+
+def normalize_query(query: str) -> str:
+    """Fold width, case and spacing so near-identical queries share one key"""
+    normalized = unicodedata.normalize("NFKC", query).casefold()
+    normalized = _WHITESPACE.sub(" ", normalized)
+    return normalized.strip(_EDGE_PUNCTUATION)
+
+
+class WebSearchCache:
+    """LRU cache of WebSearchResponse keyed by normalized query, optionally backed by DB"""
+
+    def __init__(self, maxsize: int, ttl_seconds: int, persist: bool) -> None:
+        self._ttl_seconds: int = ttl_seconds
+        self._persist: bool = persist
+        self._memory: TTLCache[str, WebSearchResponse] = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.persistent_hits: int = 0
+
+    async def get(self, query: str) -> WebSearchResponse | None:
+        key = self._key(query)
+        cached = self._memory.get(key)
+        if cached is not None:
+            logger.info("Web search cache hit: query=%s", query)
+            return cached
+
+        if not self._persist:
+            return None
+
+        try:
+            stored = await self._load(key)
+        except Exception:
+            # the cache is best effort: a database error is a miss, not a failed search
+            logger.exception("Failed to read web search cache: query=%s", query)
+            return None
+        if stored is not None:
+            logger.info("Web search cache hit from db: query=%s", query)
+            self.persistent_hits += 1
+            self._memory.set(key, stored)
+        return stored
+
+    async def set(self, query: str, response: WebSearchResponse) -> None:
+        key = self._key(query)
+        self._memory.set(key, response)
+        if self._persist:
+            try:
+                await self._store(key, query, response)
+            except Exception:
+                logger.exception("Failed to store web search cache: query=%s", query)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._memory.stats()
+        stats["persistent_hits"] = self.persistent_hits
+        return stats
+
+    def _key(self, query: str) -> str:
+        return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+    async def _load(self, key: str) -> WebSearchResponse | None:
+        async with database.async_session_scope() as db:
+            fetched_model = await db.get(WebSearchCacheModel, key)
+            if fetched_model is None:
+                return None
+            if fetched_model.created_at < datetime.now() - timedelta(seconds=self._ttl_seconds):
+                await db.delete(fetched_model)
+                return None
+            return WebSearchResponse(
+                search_result=fetched_model.search_result,
+                related_links=fetched_model.related_links,
+            )
+
+    async def _store(self, key: str, query: str, response: WebSearchResponse) -> None:
+        async with database.async_session_scope() as db:
+            await db.merge(
+                WebSearchCacheModel(
+                    query_key=key,
+                    query=query,
+                    search_result=response.search_result,
+                    related_links=[link.model_dump() for link in response.related_links],
+                    created_at=datetime.now(),
+                )
+            )
+
+
+web_search_cache = WebSearchCache(
+    maxsize=settings.WEB_SEARCH_CACHE_SIZE,
+    ttl_seconds=settings.WEB_SEARCH_CACHE_TTL_SECONDS,
+    persist=settings.WEB_SEARCH_CACHE_PERSIST,
+)
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Dict, List
+
+
+class JSONArrayStreamParser:
+    """
+    Pick complete objects out of a JSON array while the text is still streaming.
+
+    Only the array stored under ``key`` is scanned, and every character is looked
+    at once, so feeding N chunks costs O(total length).
+    """
+
+    def __init__(self, key: str) -> None:
+        self._marker: str = f'"{key}"'
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._in_array: bool = False
+        self._finished: bool = False
+        self._depth: int = 0
+        self._in_string: bool = False
+        self._escaped: bool = False
+        self._start: int = -1
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Append text and return objects that became complete with it"""
+        self._buffer += text
+        if self._finished:
+            return []
+
+        if not self._in_array and not self._find_array():
+            return []
+
+        objects: List[Dict[str, Any]] = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0 and char == "{":
+                    self._start = i
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # closing bracket of the array itself
+                    self._finished = True
+                    self._pos = i + 1
+                    return objects
+                self._depth -= 1
+                if self._depth == 0 and char == "}":
+                    try:
+                        objects.append(json.loads(buffer[self._start : i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+        self._pos = len(buffer)
+        return objects
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def _find_array(self) -> bool:
+        key_at = self._buffer.find(self._marker)
+        if key_at == -1:
+            return False
+        bracket_at = self._buffer.find("[", key_at + len(self._marker))
+        if bracket_at == -1:
+            return False
+        self._in_array = True
+        self._pos = bracket_at + 1
+        return True
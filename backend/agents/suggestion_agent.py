@@ -1,98 +1,301 @@
-from anthropic import Anthropic
-from anthropic.types import MessageParam, ToolUnionParam
-from typing import Dict, Any, List
+import asyncio
+import hashlib
+import itertools
+from contextlib import aclosing
+from anthropic import AsyncAnthropic
+from anthropic.types import Message, MessageParam, TextBlockParam, ToolUnionParam, ToolUseBlock
+from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
+from opentelemetry import trace
+from pydantic import ValidationError
+from typing import AsyncIterator, Dict, Any, List, Tuple
 from backend.schemas.assistant_schemas import (
+    AgentConversation,
     WritingSession,
+    Suggestion,
     SuggestionAgentResponse,
     SuggestionResponse,
+    SuggestionStreamEvent,
+    RelatedLink,
 )
 from backend.core.settings import settings
 from backend.core.logger import get_logger
+from backend.core.metrics import ANTHROPIC_REQUEST_SECONDS, WEB_SEARCH_SECONDS, observe
+from backend.core.tracing import set_attributes, set_llm_attributes, stream_span, traced
 from backend.exceptions.exceptions import AgentException
 from backend.agents.web_search_agent import WebSearchAgent, WebSearchResponse
+from backend.agents.stream_parser import JSONArrayStreamParser
+from backend.agents.prompt_cache import (
+    cached_system,
+    cached_tools,
+    with_cache_breakpoints,
+    log_usage,
+)
 
 logger = get_logger(__name__)
 
+ToolOutput = Tuple[str, List[RelatedLink]]
+
+MODEL = "claude-3-5-haiku-latest"
+MAX_TOKENS = 1000
 
-class SuggestAgent:
-    def __init__(self):
-        self._client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        self._web_search_client: WebSearchAgent = WebSearchAgent()
-        self._related_links: List = []
 
-    def generate_suggestion(
-        self, writing_session: WritingSession, current_section_id: str, current_content: str
+class SuggestAgent:
+    def __init__(self, client: AsyncAnthropic):
+        self._client: AsyncAnthropic = client
+        self._web_search_client: WebSearchAgent = WebSearchAgent(client=client)
+        self._related_links: List[RelatedLink] = []
+
+    async def generate_suggestion(
+        self,
+        writing_session: WritingSession,
+        current_section_id: str,
+        current_content: str,
+        conversation: AgentConversation | None = None,
     ) -> SuggestionResponse:
-        system_prompt = self._system_prompt()
-        prompt = self._build_prompt(
-            session=writing_session,
-            current_session_id=current_section_id,
+        events = self.stream_suggestion(
+            writing_session=writing_session,
+            current_section_id=current_section_id,
             current_content=current_content,
+            conversation=conversation,
         )
-        tools: list[ToolUnionParam] = self._build_tools()
-        messages: list[MessageParam] = [{"role": "user", "content": prompt}]
-
-        while True:
-            logger.info("Called suggest agent")
-            response = self._client.messages.create(
-                model="claude-3-5-haiku-latest",
-                max_tokens=1000,
-                system=system_prompt,
-                tools=tools,
-                messages=messages,
+        # closed on return, so the run span ends with the suggestion
+        async with aclosing(events):
+            async for event in events:
+                if event.event == "done" and isinstance(event.data, SuggestionResponse):
+                    return event.data
+
+        raise AgentException(
+            message="Suggest agent finished without response",
+            endpoint="/assist",
+        )
+
+    async def stream_suggestion(
+        self,
+        writing_session: WritingSession,
+        current_section_id: str,
+        current_content: str,
+        conversation: AgentConversation | None = None,
+    ) -> AsyncIterator[SuggestionStreamEvent]:
+        """
+        Run the agent loop on the streaming API and yield progress events.
+
+        With a conversation, earlier turns are resent as history and only the
+        sections changed since the last turn go into the new prompt. The
+        conversation is updated in place once the suggestion is complete.
+        """
+
+        system_prompt = cached_system(self._system_prompt())
+        history: List[MessageParam] = self._load_history(conversation)
+        if conversation is not None and history:
+            prompt = self._build_delta_prompt(
+                session=writing_session,
+                conversation=conversation,
+                current_section_id=current_section_id,
+                current_content=current_content,
             )
+        else:
+            prompt = self._build_prompt(
+                session=writing_session,
+                current_session_id=current_section_id,
+                current_content=current_content,
+                previous_summaries=conversation.summaries if conversation else None,
+            )
+        tools: list[ToolUnionParam] = cached_tools(self._build_tools())
+        messages: list[MessageParam] = history + [{"role": "user", "content": prompt}]
+        usage_totals: Dict[str, int] = {}
+
+        with stream_span(
+            "suggest_agent.run",
+            model=MODEL,
+            section_id=current_section_id,
+            continued=bool(history),
+        ) as run_span:
+            for turn in itertools.count(1):
+                logger.info("Called suggest agent")
+                with stream_span("suggest_agent.turn", parent=run_span, turn=turn) as turn_span:
+                    # the API stream is drained (and timed) by a task of its own, so the
+                    # request duration does not include how long the client takes per event
+                    suggestions: asyncio.Queue[Suggestion | None] = asyncio.Queue()
+                    request = asyncio.create_task(
+                        self._stream_turn(system_prompt, tools, messages, suggestions)
+                    )
+                    try:
+                        while (suggestion := await suggestions.get()) is not None:
+                            yield SuggestionStreamEvent(event="suggestion", data=suggestion)
+                        response = await request
+                    finally:
+                        request.cancel()
+                    log_usage(agent="suggest", model=MODEL, usage=response.usage)
+                    self._add_usage(usage_totals, response.usage)
+                    set_llm_attributes(turn_span, MODEL, response.stop_reason, response.usage)
+
+                    if response.stop_reason == "tool_use":
+                        logger.info("Suggest agent calls tool")
+                        messages.append(
+                            {"role": "assistant", "content": self._to_params(response.content)}
+                        )
+                        tool_blocks = [
+                            block for block in response.content if block.type == "tool_use"
+                        ]
+                        logger.info("Executing tools: count=%s", len(tool_blocks))
+                        turn_span.set_attribute("tool_calls", len(tool_blocks))
+                        for block in tool_blocks:
+                            if block.name == "web_search":
+                                yield SuggestionStreamEvent(
+                                    event="searching", data=str(block.input.get("query", ""))
+                                )
+
+                        # tool spans become children of this turn
+                        with trace.use_span(turn_span):
+                            tasks = self._start_tools(tool_blocks)
+                        try:
+                            for finished in asyncio.as_completed(tasks):
+                                _, related_links = await finished
+                                if related_links:
+                                    yield SuggestionStreamEvent(
+                                        event="related_links", data=related_links
+                                    )
+                        finally:
+                            for task in tasks:
+                                task.cancel()
+
+                        # tasks keep the tool_use order, so results line up with tool_use ids
+                        tool_results = []
+                        for block, task in zip(tool_blocks, tasks):
+                            result, related_links = task.result()
+                            self._related_links.extend(related_links)
+                            tool_results.append(
+                                {
+                                    "type": "tool_result",
+                                    "tool_use_id": block.id,
+                                    "content": result,
+                                }
+                            )
+                        messages.append({"role": "user", "content": tool_results})
+                        logger.info("Return results to suggest agent")
+
+                    elif response.stop_reason == "end_turn":
+                        logger.info("Finish generating suggestion")
+                        _agent_response: SuggestionAgentResponse = (
+                            SuggestionAgentResponse.model_validate_json(self._final_text(response))
+                        )
 
-            if response.stop_reason == "tool_use":
-                logger.info("Suggest agent calls tool")
-                messages.append({"role": "assistant", "content": response.content})
-                tool_results = []
-                tool_count = 0
-                for block in response.content:
-                    if block.type == "tool_use":
-                        tool_name = block.name
-                        tool_input = block.input
-                        tool_id = block.id
-
-                        tool_count += 1
-                        logger.info("Executing tool: count=%s", tool_count)
-                        result = self._execute_tool(tool_name, tool_input)
-
-                        logger.info("Appending tool result")
-                        tool_results.append(
+                        logger.info("Conpleted suggestion")
+                        logger.info("Suggestion token usage total: %s", usage_totals)
+                        set_attributes(run_span, turns=turn, related_links=len(self._related_links))
+                        run_span.set_attributes(
                             {
-                                "type": "tool_result",
-                                "tool_use_id": tool_id,
-                                "content": result,
+                                f"gen_ai.usage.{field}": count
+                                for field, count in usage_totals.items()
                             }
                         )
-                messages.append({"role": "user", "content": tool_results})
-                logger.info("Return results to suggest agent")
-
-            elif response.stop_reason == "end_turn":
-                logger.info("Finish generating suggestion")
-                final_text = ""
-                for block in response.content:
-                    if block.type == "text":
-                        final_text = block.text
-
-                _agent_response: SuggestionAgentResponse = (
-                    SuggestionAgentResponse.model_validate_json(final_text)
-                )
 
-                logger.info("Conpleted suggestion")
+                        if conversation is not None:
+                            messages.append(
+                                {"role": "assistant", "content": self._to_params(response.content)}
+                            )
+                            self._remember(
+                                conversation=conversation,
+                                messages=messages,
+                                session=writing_session,
+                                summary_report=_agent_response.summary_report,
+                                continued=bool(history),
+                            )
+
+                        suggestion_respons: SuggestionResponse = SuggestionResponse(
+                            suggestions=_agent_response.suggestions,
+                            related_links=self._related_links,
+                            summary_report=_agent_response.summary_report,
+                        )
+                        yield SuggestionStreamEvent(
+                            event="summary_report", data=_agent_response.summary_report
+                        )
+                        yield SuggestionStreamEvent(event="done", data=suggestion_respons)
+                        return
 
-                suggestion_respons: SuggestionResponse = SuggestionResponse(
-                    suggestions=_agent_response.suggestions,
-                    related_links=self._related_links,
-                    summary_report=_agent_response.summary_report,
-                )
-                return suggestion_respons
+                    else:
+                        raise AgentException(
+                            message="Unexpected stop reason agent stoped",
+                            endpoint="/assist",
+                        )
 
-            else:
-                raise AgentException(
-                    message="Unexpected stop reason agent stoped",
-                    endpoint="/assist",
-                )
+    async def _stream_turn(
+        self,
+        system_prompt: List[TextBlockParam],
+        tools: List[ToolUnionParam],
+        messages: List[MessageParam],
+        suggestions: asyncio.Queue[Suggestion | None],
+    ) -> Message:
+        """One streamed model call: put each complete suggestion on suggestions, then None"""
+
+        parser = JSONArrayStreamParser(key="suggestions")
+        try:
+            with observe(ANTHROPIC_REQUEST_SECONDS, agent="suggest", model=MODEL):
+                async with self._client.messages.stream(
+                    model=MODEL,
+                    max_tokens=MAX_TOKENS,
+                    system=system_prompt,
+                    tools=tools,
+                    messages=with_cache_breakpoints(messages),
+                ) as stream:
+                    async for text in stream.text_stream:
+                        for parsed in parser.feed(text):
+                            try:
+                                suggestions.put_nowait(Suggestion.model_validate(parsed))
+                            except ValidationError:
+                                continue
+                    return await stream.get_final_message()
+        finally:
+            suggestions.put_nowait(None)
+
+    def build_batch_params(
+        self,
+        writing_session: WritingSession,
+        current_section_id: str,
+        current_content: str,
+    ) -> MessageCreateParamsNonStreaming:
+        """
+        Single-shot request for the Message Batches API.
+
+        A batch cannot answer tool_use, so no tools are sent and the model has to
+        answer from the session alone. System prompt and context block are the
+        same for every section, so the requests share one cached prefix.
+        """
+
+        prompt = self._build_prompt(
+            session=writing_session,
+            current_session_id=current_section_id,
+            current_content=current_content,
+        )
+        return {
+            "model": MODEL,
+            "max_tokens": MAX_TOKENS,
+            "system": cached_system(self._system_prompt()),
+            "messages": with_cache_breakpoints([{"role": "user", "content": prompt}]),
+        }
+
+    def parse_message(self, message: Message) -> SuggestionResponse:
+        """SuggestionResponse from the final message of a single-shot request"""
+
+        log_usage(agent="suggest_batch", model=message.model, usage=message.usage)
+        if message.stop_reason != "end_turn":
+            raise AgentException(
+                message=f"Unexpected stop reason: {message.stop_reason}",
+                endpoint="/assist",
+            )
+        _agent_response = SuggestionAgentResponse.model_validate_json(self._final_text(message))
+        return SuggestionResponse(
+            suggestions=_agent_response.suggestions,
+            related_links=[],
+            summary_report=_agent_response.summary_report,
+        )
+
+    def _final_text(self, message: Message) -> str:
+        final_text = ""
+        for block in message.content:
+            if block.type == "text":
+                final_text = block.text
+        return final_text
 
     def _system_prompt(self):
         _system_prompt: str = """
@@ -112,6 +315,13 @@ class SuggestAgent:
         - content : 記事全文
         - current_section_id : 現在執筆中の目次項目
         - current_content : 現在執筆中の目次項目の内容
+        - previous_feedback : 以前のアドバイスの要約（ある場合のみ）
+
+        ## 2回目以降のリクエスト
+        同じ記事への2回目以降のリクエストでは、前回から変更された項目（updated_content など）
+        のみが送られます。
+        送られていない目次項目の内容は、これまでの会話で受け取った内容から変わっていません。
+        すでに行ったWeb検索の結果は会話履歴にあるため、同じ検索を繰り返さないでください。
 
         ## 最終出力要件
 
@@ -207,32 +417,171 @@ class SuggestAgent:
         return _system_prompt
 
     def _build_prompt(
-        self, session: WritingSession, current_session_id: str, current_content: str
-    ) -> str:
-        """prompt building"""
+        self,
+        session: WritingSession,
+        current_session_id: str,
+        current_content: str,
+        previous_summaries: List[str] | None = None,
+    ) -> List[TextBlockParam]:
+        """
+        prompt building
+
+        The session context comes first as its own block so it can be cached as a
+        prefix; the section being written changes on every call and goes last.
+        """
 
-        prompt: str = f"""
+        context: str = f"""
         - topic: {session.topic}
         - target_audience: {session.target_audience}
         - outline: {session.outline}
         - content: {session.content}
+        """
+        current: str = f"""
         - current_session_id: {current_session_id}
         - current_content: {current_content}
         """
+        if previous_summaries:
+            current += f"- previous_feedback: {previous_summaries}\n"
+        return [{"type": "text", "text": context}, {"type": "text", "text": current}]
+
+    def _build_delta_prompt(
+        self,
+        session: WritingSession,
+        conversation: AgentConversation,
+        current_section_id: str,
+        current_content: str,
+    ) -> str:
+        """prompt building for a follow-up turn (only what changed since the last turn)"""
+
+        digests = self._section_digests(session)
+        updated_content = {
+            section_id: session.content[section_id]
+            for section_id, digest in digests.items()
+            if conversation.section_digests.get(section_id) != digest
+        }
+        removed_sections = [
+            section_id for section_id in conversation.section_digests if section_id not in digests
+        ]
+
+        prompt: str = ""
+        if self._context_digest(session) != conversation.context_digest:
+            prompt += f"""
+        - topic: {session.topic}
+        - target_audience: {session.target_audience}
+        - outline: {session.outline}
+        """
+        prompt += f"""
+        - updated_content: {updated_content}
+        - removed_sections: {removed_sections}
+        - current_session_id: {current_section_id}
+        - current_content: {current_content}
+        """
         return prompt
 
-    def _execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> str:
-        """Execute the tool and return result"""
+    def _load_history(self, conversation: AgentConversation | None) -> List[MessageParam]:
+        """Earlier messages to resend, or nothing when the history has to start over"""
+
+        if conversation is None or not conversation.messages:
+            return []
+        if conversation.turns >= settings.AGENT_HISTORY_MAX_TURNS:
+            logger.info("Conversation is full, starting over: turns=%s", conversation.turns)
+            return []
+        return list(conversation.messages)  # type: ignore[arg-type]
+
+    def _remember(
+        self,
+        conversation: AgentConversation,
+        messages: List[MessageParam],
+        session: WritingSession,
+        summary_report: str,
+        continued: bool,
+    ) -> None:
+        """Store this turn in the conversation, compacting old tool results"""
+
+        limit = settings.AGENT_HISTORY_TOOL_RESULT_CHARS
+        compacted: List[Dict[str, Any]] = []
+        for message in messages:
+            content = message["content"]
+            if isinstance(content, list):
+                blocks: List[Any] = []
+                for block in content:
+                    if (
+                        isinstance(block, dict)
+                        and block.get("type") == "tool_result"
+                        and isinstance(block.get("content"), str)
+                        and len(block["content"]) > limit
+                    ):
+                        block = {**block, "content": block["content"][:limit] + "…"}
+                    blocks.append(block)
+                content = blocks
+            compacted.append({"role": message["role"], "content": content})
+
+        conversation.messages = compacted
+        conversation.section_digests = self._section_digests(session)
+        conversation.context_digest = self._context_digest(session)
+        conversation.summaries = (conversation.summaries + [summary_report])[-3:]
+        conversation.turns = conversation.turns + 1 if continued else 1
+
+    def _add_usage(self, totals: Dict[str, int], usage: Any) -> None:
+        for field in (
+            "input_tokens",
+            "output_tokens",
+            "cache_read_input_tokens",
+            "cache_creation_input_tokens",
+        ):
+            totals[field] = totals.get(field, 0) + (getattr(usage, field, None) or 0)
+
+    def _section_digests(self, session: WritingSession) -> Dict[str, str]:
+        return {
+            section_id: hashlib.sha256(text.encode("utf-8")).hexdigest()
+            for section_id, text in session.content.items()
+        }
 
-        if tool_name == "web_search":
-            _web_search_response: WebSearchResponse = self._web_search_client.search_web(
-                query=tool_input["query"]
-            )
+    def _context_digest(self, session: WritingSession) -> str:
+        context = f"{session.topic}|{session.target_audience}|{session.outline}"
+        return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+    def _to_params(self, content: List[Any]) -> List[Dict[str, Any]]:
+        """Turn response content blocks into JSON-storable message params"""
+
+        params: List[Dict[str, Any]] = []
+        for block in content:
+            if block.type == "text" and block.text:
+                params.append({"type": "text", "text": block.text})
+            elif block.type == "tool_use":
+                params.append(
+                    {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input}
+                )
+        return params
 
-            self._related_links = _web_search_response.related_links
+    def _start_tools(self, tool_blocks: List[ToolUseBlock]) -> List[asyncio.Task[ToolOutput]]:
+        """Start tool_use blocks of one turn concurrently, keeping their order"""
 
-            return f"Search result for: {tool_input['query']}- {_web_search_response.search_result}"
-        return "Unknown tool"
+        semaphore = asyncio.Semaphore(settings.SUGGEST_TOOL_CONCURRENCY)
+
+        async def _run(block: ToolUseBlock) -> ToolOutput:
+            async with semaphore:
+                logger.info("Executing tool: name=%s, id=%s", block.name, block.id)
+                return await self._execute_tool(block.name, block.input)
+
+        return [asyncio.create_task(_run(block)) for block in tool_blocks]
+
+    @traced("suggest_agent.execute_tool")
+    async def _execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> ToolOutput:
+        """Execute the tool and return result with its related links"""
+
+        set_attributes(tool=tool_name)
+        if tool_name == "web_search":
+            with observe(WEB_SEARCH_SECONDS):
+                _web_search_response: WebSearchResponse = await self._web_search_client.search_web(
+                    query=tool_input["query"]
+                )
+
+            return (
+                f"Search result for: {tool_input['query']}- {_web_search_response.search_result}",
+                _web_search_response.related_links,
+            )
+        return "Unknown tool", []
 
     def _build_tools(self) -> List[ToolUnionParam]:
         """tools buildeing for anthropic agent"""
@@ -0,0 +1,145 @@
+"""
+Backends for offline batch suggestions.
+
+``AnthropicBatchBackend`` submits to the Message Batches API (half price, results
+within 24h). ``LocalBatchBackend`` answers the same requests with plain
+messages.create calls in the background, for development and tests.
+"""
+
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from anthropic.types import Message
+from anthropic.types.messages.batch_create_params import Request
+from backend.core.clients import ClientRegistry, client_registry
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+from backend.core.metrics import ANTHROPIC_REQUEST_SECONDS, observe
+
+logger = get_logger(__name__)
+
+# custom_id -> final message, or the reason the request did not succeed
+BatchOutputs = Dict[str, Message | str]
+
+# finished local batches are kept for polling, then dropped
+LOCAL_BATCH_TTL_SECONDS = 3600
+LOCAL_BATCH_MAX_FINISHED = 100
+
+
+class SuggestionBatchBackend(ABC):
+    name: str
+
+    def __init__(self, clients: ClientRegistry) -> None:
+        # the client is looked up per call, the backend is built before the app starts
+        self._clients: ClientRegistry = clients
+
+    @abstractmethod
+    async def submit(self, requests: List[Request]) -> str:
+        """Submit requests and return the batch id"""
+
+    @abstractmethod
+    async def retrieve(self, batch_id: str) -> Tuple[bool, BatchOutputs]:
+        """Return whether the batch has ended, and its outputs once it has"""
+
+
+class AnthropicBatchBackend(SuggestionBatchBackend):
+    name = "anthropic"
+
+    async def submit(self, requests: List[Request]) -> str:
+        batch = await self._clients.anthropic.messages.batches.create(requests=requests)
+        logger.info("Submitted message batch: batch_id=%s, requests=%s", batch.id, len(requests))
+        return batch.id
+
+    async def retrieve(self, batch_id: str) -> Tuple[bool, BatchOutputs]:
+        batch = await self._clients.anthropic.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return False, {}
+
+        outputs: BatchOutputs = {}
+        async for entry in await self._clients.anthropic.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                outputs[entry.custom_id] = entry.result.message
+            elif entry.result.type == "errored":
+                outputs[entry.custom_id] = entry.result.error.error.message
+            else:
+                outputs[entry.custom_id] = f"Request {entry.result.type}"
+        return True, outputs
+
+
+class LocalBatchBackend(SuggestionBatchBackend):
+    """
+    Stand-in that keeps batches in memory of this process. Finished batches
+    are kept for LOCAL_BATCH_TTL_SECONDS, at most LOCAL_BATCH_MAX_FINISHED of
+    them; an expired batch reads as ended with no outputs.
+    """
+
+    name = "local"
+
+    def __init__(self, clients: ClientRegistry) -> None:
+        super().__init__(clients=clients)
+        self._outputs: Dict[str, BatchOutputs] = {}
+        self._running: Dict[str, asyncio.Task[None]] = {}
+        # batch_id -> monotonic time it finished, oldest first
+        self._finished: OrderedDict[str, float] = OrderedDict()
+
+    async def submit(self, requests: List[Request]) -> str:
+        self._expire()
+        batch_id = f"local_{uuid.uuid4().hex}"
+        self._outputs[batch_id] = {}
+        self._running[batch_id] = asyncio.create_task(self._run(batch_id, requests))
+        logger.info("Started local batch: batch_id=%s, requests=%s", batch_id, len(requests))
+        return batch_id
+
+    async def retrieve(self, batch_id: str) -> Tuple[bool, BatchOutputs]:
+        self._expire()
+        if batch_id not in self._outputs:
+            # submitted by another process or before a restart: nothing to wait for
+            return True, {}
+        if batch_id not in self._finished:
+            return False, {}
+        return True, self._outputs[batch_id]
+
+    async def _run(self, batch_id: str, requests: List[Request]) -> None:
+        semaphore = asyncio.Semaphore(settings.SUGGEST_BATCH_CONCURRENCY)
+
+        async def _answer(request: Request) -> None:
+            async with semaphore:
+                try:
+                    with observe(
+                        ANTHROPIC_REQUEST_SECONDS,
+                        agent="suggest_batch_local",
+                        model=request["params"]["model"],
+                    ):
+                        message = await self._clients.anthropic.messages.create(**request["params"])
+                except Exception as e:
+                    logger.exception("Local batch request failed: %s", request["custom_id"])
+                    self._outputs[batch_id][request["custom_id"]] = str(e)
+                    return
+                self._outputs[batch_id][request["custom_id"]] = message
+
+        try:
+            await asyncio.gather(*(_answer(request) for request in requests))
+        finally:
+            self._finished[batch_id] = time.monotonic()
+            self._running.pop(batch_id, None)
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - LOCAL_BATCH_TTL_SECONDS
+        while self._finished:
+            batch_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > deadline and len(self._finished) <= LOCAL_BATCH_MAX_FINISHED:
+                break
+            del self._finished[batch_id]
+            self._outputs.pop(batch_id, None)
+
+
+def build_batch_backend() -> SuggestionBatchBackend:
+    if settings.SUGGEST_BATCH_BACKEND == "local":
+        return LocalBatchBackend(clients=client_registry)
+    return AnthropicBatchBackend(clients=client_registry)
+
+
+suggestion_batch_backend: SuggestionBatchBackend = build_batch_backend()
@@ -1,37 +1,54 @@
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from anthropic.types import ToolUnionParam, MessageParam
 from anthropic.types.web_search_tool_result_block import WebSearchToolResultBlock
-from backend.core.settings import settings
 from typing import List
 from backend.schemas.assistant_schemas import WebSearchResponse, RelatedLink
 from backend.exceptions.exceptions import AgentException
 from backend.core.logger import get_logger
+from backend.agents.search_cache import web_search_cache
+from backend.agents.prompt_cache import cached_system, cached_tools, log_usage
+from backend.core.metrics import ANTHROPIC_REQUEST_SECONDS, observe
+from backend.core.tracing import set_attributes, set_llm_attributes, traced
 
 logger = get_logger(__name__)
 
+MODEL = "claude-3-5-haiku-latest"
+
 
 class WebSearchAgent:
-    def __init__(self):
-        self._client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    def __init__(self, client: AsyncAnthropic):
+        self._client: AsyncAnthropic = client
 
-    def search_web(self, query: str) -> WebSearchResponse:
+    @traced("web_search_agent.search_web")
+    async def search_web(self, query: str) -> WebSearchResponse:
         """web search agent"""
 
-        system_prompt = self._system_prompt()
-        tools: List[ToolUnionParam] = [
-            {"type": "web_search_20250305", "name": "web_search", "max_uses": 5}
-        ]
+        cached_response = await web_search_cache.get(query)
+        set_attributes(query=query, cache_hit=cached_response is not None)
+        if cached_response is not None:
+            return cached_response
+
+        system_prompt = cached_system(self._system_prompt())
+        tools: List[ToolUnionParam] = cached_tools(
+            [{"type": "web_search_20250305", "name": "web_search", "max_uses": 5}]
+        )
         prompt = f"search query from parent agent: {query}"
         messages: List[MessageParam] = [{"role": "user", "content": prompt}]
 
         logger.info("Called web search agent")
-        response = self._client.messages.create(
-            model="claude-3-5-haiku-latest",
-            max_tokens=1000,
-            system=system_prompt,
-            tools=tools,
-            messages=messages,
-        )
+        with observe(ANTHROPIC_REQUEST_SECONDS, agent="web_search", model=MODEL):
+            response = await self._client.messages.create(
+                model=MODEL,
+                max_tokens=1000,
+                system=system_prompt,
+                tools=tools,
+                messages=messages,
+            )
+
+        log_usage(agent="web_search", model=MODEL, usage=response.usage)
+        set_llm_attributes(None, MODEL, response.stop_reason, response.usage)
+        server_tool_use = getattr(response.usage, "server_tool_use", None)
+        set_attributes(web_search_requests=getattr(server_tool_use, "web_search_requests", None))
 
         search_report: str = ""
 
@@ -64,10 +81,12 @@ class WebSearchAgent:
                 )
             logger.info(related_links)
             logger.info(search_report)
+            set_attributes(related_links=len(related_links))
             search_response: WebSearchResponse = WebSearchResponse(
                 search_result=search_report, related_links=related_links
             )
             logger.info("Properly finished web search")
+            await web_search_cache.set(query, search_response)
 
             return search_response
 
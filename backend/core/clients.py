@@ -0,0 +1,121 @@
+import threading
+import anthropic
+import httpx
+import openai
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI, OpenAI
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClientRegistry:
+    """
+    Process-wide Anthropic and OpenAI clients.
+
+    Every SDK client owns an httpx connection pool, so building one per request
+    pays DNS, TCP and TLS setup each time. The registry builds each client once
+    with a keep-alive pool sized by LLM_HTTP_* settings, is started and closed
+    by the app lifespan, and reaches routers through get_clients().
+
+    A client asked for before start() (a script, a worker thread) is built on
+    first use.
+    """
+
+    def __init__(self) -> None:
+        self._anthropic: AsyncAnthropic | None = None
+        self._async_openai: AsyncOpenAI | None = None
+        self._openai: OpenAI | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Build every client up front so the first request does not pay for it"""
+        for name in ("anthropic", "async_openai", "openai"):
+            getattr(self, name)
+        logger.info(
+            "API clients ready: max_connections=%s, max_keepalive=%s",
+            settings.LLM_HTTP_MAX_CONNECTIONS,
+            settings.LLM_HTTP_MAX_KEEPALIVE,
+        )
+
+    async def aclose(self) -> None:
+        with self._lock:
+            anthropic_client, self._anthropic = self._anthropic, None
+            async_openai_client, self._async_openai = self._async_openai, None
+            openai_client, self._openai = self._openai, None
+        if anthropic_client is not None:
+            await anthropic_client.close()
+        if async_openai_client is not None:
+            await async_openai_client.close()
+        if openai_client is not None:
+            openai_client.close()
+        logger.info("API clients closed")
+
+    @property
+    def anthropic(self) -> AsyncAnthropic:
+        if self._anthropic is None:
+            with self._lock:
+                if self._anthropic is None:
+                    self._anthropic = AsyncAnthropic(
+                        api_key=settings.ANTHROPIC_API_KEY,
+                        http_client=anthropic.DefaultAsyncHttpxClient(
+                            limits=self._limits(), timeout=self._timeout(anthropic.Timeout)
+                        ),
+                        timeout=self._timeout(anthropic.Timeout),
+                        max_retries=settings.LLM_MAX_RETRIES,
+                    )
+        return self._anthropic
+
+    @property
+    def async_openai(self) -> AsyncOpenAI:
+        if self._async_openai is None:
+            with self._lock:
+                if self._async_openai is None:
+                    self._async_openai = AsyncOpenAI(
+                        api_key=settings.OPENAI_API_KEY,
+                        http_client=openai.DefaultAsyncHttpxClient(
+                            limits=self._limits(), timeout=self._timeout(openai.Timeout)
+                        ),
+                        timeout=self._timeout(openai.Timeout),
+                        max_retries=settings.LLM_MAX_RETRIES,
+                    )
+        return self._async_openai
+
+    @property
+    def openai(self) -> OpenAI:
+        """Blocking client for sync routes and job workers, safe to share across threads"""
+
+        if self._openai is None:
+            with self._lock:
+                if self._openai is None:
+                    self._openai = OpenAI(
+                        api_key=settings.OPENAI_API_KEY,
+                        http_client=openai.DefaultHttpxClient(
+                            limits=self._limits(), timeout=self._timeout(openai.Timeout)
+                        ),
+                        timeout=self._timeout(openai.Timeout),
+                        max_retries=settings.LLM_MAX_RETRIES,
+                    )
+        return self._openai
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    def _timeout(self, timeout_class: type[httpx.Timeout]) -> httpx.Timeout:
+        # each SDK re-exports the Timeout class of the httpx it was built against
+        return timeout_class(
+            settings.LLM_HTTP_TIMEOUT,
+            connect=settings.LLM_HTTP_CONNECT_TIMEOUT,
+        )
+
+
+client_registry: ClientRegistry = ClientRegistry()
+
+
+def get_clients() -> ClientRegistry:
+    return client_registry
@@ -1,9 +1,26 @@
-from typing import Generator
+from typing import AsyncGenerator, AsyncIterator, Generator, Iterator
+from contextlib import asynccontextmanager, contextmanager
 import json
 from sqlalchemy import create_engine, Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, Session
 from backend.core.settings import settings
 from backend.models.session_model import Base
+from backend.models import (  # noqa: F401  register tables
+    search_cache_model,
+    conversation_model,
+    suggestion_batch_model,
+    job_model,
+)
+
+
+def _json_serializer(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False)
 
 
 class DataBase:
@@ -11,18 +28,21 @@ class DataBase:
         self._user: str = settings.POSTGRES_USER
         self._pass: str = settings.POSTGRES_PASSWORD
         self._db: str = settings.POSTGRES_DB
-        self._host: str = "postgres"
-        self._port: int = 5432
+        self._host: str = settings.POSTGRES_HOST
+        self._port: int = settings.POSTGRES_PORT
 
-        self._database_url = (
-            f"postgresql://{self._user}:{self._pass}@{self._host}:{self._port}/{self._db}"
-        )
+        _location = f"{self._user}:{self._pass}@{self._host}:{self._port}/{self._db}"
+        self._database_url = f"postgresql+psycopg2://{_location}"
+        self._async_database_url = f"postgresql+asyncpg://{_location}"
 
         self._engine: Engine = create_engine(
             self._database_url,
             echo=True,
             pool_pre_ping=True,
-            json_serializer=lambda obj: json.dumps(obj, ensure_ascii=False),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            json_serializer=_json_serializer,
         )
 
         self._session_local = sessionmaker(
@@ -30,11 +50,33 @@ class DataBase:
             bind=self._engine,
         )
 
+        # asyncpg engine: DB waits don't hold a worker thread
+        self._async_engine: AsyncEngine = create_async_engine(
+            self._async_database_url,
+            echo=True,
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            json_serializer=_json_serializer,
+        )
+
+        self._async_session_local = async_sessionmaker(
+            autoflush=False,
+            expire_on_commit=False,
+            bind=self._async_engine,
+        )
+
     @property
     def engine(self) -> Engine:
         """ "エンジンを取得"""
         return self._engine
 
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """非同期エンジンを取得"""
+        return self._async_engine
+
     def get_session(self) -> Generator[Session, None, None]:
         """sessionを取得"""
         session = self._session_local()
@@ -47,13 +89,46 @@ class DataBase:
         finally:
             session.close()
 
+    async def get_async_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """非同期sessionを取得"""
+        async with self.async_session_scope() as session:
+            yield session
+
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """リクエスト外で使うsession (commit/rollback/closeまで面倒を見る)"""
+        yield from self.get_session()
+
+    @asynccontextmanager
+    async def async_session_scope(self) -> AsyncIterator[AsyncSession]:
+        """非同期session (commit/rollback/closeまで面倒を見る)"""
+        session = self._async_session_local()
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
     def create_tables(self) -> None:
         """全テーブルを作成"""
         Base.metadata.create_all(self._engine)
 
+    async def dispose(self) -> None:
+        """コネクションプールを閉じる"""
+        await self._async_engine.dispose()
+        self._engine.dispose()
+
 
 database = DataBase()
 
 
 def get_db() -> Generator[Session, None, None]:
     yield from database.get_session()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async for session in database.get_async_session():
+        yield session
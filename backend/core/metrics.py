@@ -0,0 +1,171 @@
+"""
+Prometheus metrics of every stage a request goes through.
+
+Durations are histograms in seconds, so rates, counts and latency quantiles
+per label all come from one series. GET /metrics exposes the default registry.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+from prometheus_client import Counter, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# LLM calls and pushes take seconds, file and DB calls milliseconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP requests until the last byte of the response, by route template",
+    ["method", "route", "status"],
+    buckets=BUCKETS,
+)
+DB_CALL_SECONDS = Histogram(
+    "db_call_duration_seconds",
+    "SessionManager calls including cache hits",
+    ["operation", "outcome"],
+    buckets=BUCKETS,
+)
+ANTHROPIC_REQUEST_SECONDS = Histogram(
+    "anthropic_request_duration_seconds",
+    "Anthropic messages calls, streamed ones until the final message",
+    ["agent", "model", "outcome"],
+    buckets=BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported in the usage of LLM responses",
+    ["agent", "model", "kind"],
+)
+WEB_SEARCH_SECONDS = Histogram(
+    "web_search_duration_seconds",
+    "web_search tool executions of the suggest agent",
+    ["outcome"],
+    buckets=BUCKETS,
+)
+SUBPROCESS_SECONDS = Histogram(
+    "subprocess_duration_seconds",
+    "External commands run for articles (npx zenn, git)",
+    ["command", "outcome"],
+    buckets=BUCKETS,
+)
+FILE_IO_SECONDS = Histogram(
+    "file_io_duration_seconds",
+    "Article file reads and writes",
+    ["operation"],
+    buckets=BUCKETS,
+)
+FILE_IO_BYTES = Counter(
+    "file_io_bytes_total",
+    "Bytes of article files read or written",
+    ["operation"],
+)
+
+
+_WITH_OUTCOME = {DB_CALL_SECONDS, ANTHROPIC_REQUEST_SECONDS, WEB_SEARCH_SECONDS, SUBPROCESS_SECONDS}
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """
+    Time the block; histograms with an outcome label get success or error.
+    A cancelled block (the caller went away) is not recorded.
+    """
+
+    start = time.perf_counter()
+    outcome: str | None = "error"
+    try:
+        yield
+        outcome = "success"
+    except asyncio.CancelledError:
+        outcome = None
+        raise
+    finally:
+        if outcome is not None:
+            if histogram in _WITH_OUTCOME:
+                labels["outcome"] = outcome
+            histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+def timed(histogram: Histogram, **labels: str) -> Callable[[F], F]:
+    """Decorator form of observe() for sync and async functions"""
+
+    def decorator(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with observe(histogram, **labels):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with observe(histogram, **labels):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def record_usage(agent: str, model: str, usage: Any) -> None:
+    """Count the tokens of one Anthropic usage block"""
+
+    counts = {
+        "input": usage.input_tokens,
+        "output": usage.output_tokens,
+        "cache_read": getattr(usage, "cache_read_input_tokens", None) or 0,
+        "cache_creation": getattr(usage, "cache_creation_input_tokens", None) or 0,
+    }
+    server_tool_use = getattr(usage, "server_tool_use", None)
+    counts["web_search_requests"] = getattr(server_tool_use, "web_search_requests", None) or 0
+    for kind, count in counts.items():
+        if count:
+            LLM_TOKENS.labels(agent=agent, model=model, kind=kind).inc(count)
+
+
+def command_label(args: list[str]) -> str:
+    """Program and subcommand, e.g. "git push", never arguments that carry user input"""
+
+    return " ".join(args[:2])
+
+
+class MetricsMiddleware:
+    """
+    Times each HTTP request until its response is fully sent, so SSE streams
+    count their whole duration. Labelled by route template, not by path, to
+    keep session ids and slugs out of the label values.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            ).observe(time.perf_counter() - start)
@@ -1,5 +1,6 @@
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings
+from typing import Literal
 from pathlib import Path
 
 
@@ -10,10 +11,42 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY_FILE: str
     ROOT_DIR: str = Field(default="/app")
     ARTICLE_DIR: str = Field(default="./articles")
+    ZENN_SCAFFOLD_MODE: Literal["native", "npx"] = Field(default="native")
     GITHUB_USER: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
+    POSTGRES_HOST: str = Field(default="postgres")
+    POSTGRES_PORT: int = Field(default=5432)
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(default=30.0, gt=0)
+    SUGGEST_TOOL_CONCURRENCY: int = Field(default=4, ge=1)
+    SUGGEST_BATCH_CONCURRENCY: int = Field(default=3, ge=1)
+    SUGGEST_BATCH_BACKEND: Literal["anthropic", "local"] = Field(default="anthropic")
+    WEB_SEARCH_CACHE_SIZE: int = Field(default=512, ge=0)
+    WEB_SEARCH_CACHE_TTL_SECONDS: int = Field(default=6 * 60 * 60, ge=1)
+    WEB_SEARCH_CACHE_PERSIST: bool = Field(default=False)
+    SUGGESTION_CACHE_SIZE: int = Field(default=256, ge=0)
+    SUGGESTION_CACHE_TTL_SECONDS: int = Field(default=30 * 60, ge=1)
+    AGENT_HISTORY_MAX_TURNS: int = Field(default=6, ge=1)
+    AGENT_HISTORY_TOOL_RESULT_CHARS: int = Field(default=800, ge=0)
+    SESSION_CACHE_BACKEND: Literal["memory", "postgres", "none"] = Field(default="memory")
+    SESSION_CACHE_MAX_ENTRIES: int = Field(default=1024, ge=1)
+    SESSION_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, ge=1)
+    LLM_HTTP_MAX_CONNECTIONS: int = Field(default=100, ge=1)
+    LLM_HTTP_MAX_KEEPALIVE: int = Field(default=20, ge=0)
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = Field(default=60.0, gt=0)
+    LLM_HTTP_CONNECT_TIMEOUT: float = Field(default=5.0, gt=0)
+    LLM_HTTP_TIMEOUT: float = Field(default=600.0, gt=0)
+    LLM_MAX_RETRIES: int = Field(default=2, ge=0)
+    TOPIC_EDIT_WORKERS: int = Field(default=8, ge=1)
+    JOB_DATABASE_URL: str | None = Field(default=None)
+    JOB_WORKERS: int = Field(default=2, ge=1)
+    JOB_LEASE_SECONDS: int = Field(default=60, ge=3)
+    TRACING_EXPORTER: Literal["none", "console", "file", "otlp"] = Field(default="none")
+    TRACING_FILE: str = Field(default="./traces.jsonl")
+    TRACING_SERVICE_NAME: str = Field(default="kenn-zenn-publisher")
 
     @model_validator(mode="before")
     @classmethod
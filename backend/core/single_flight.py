@@ -0,0 +1,75 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    def __init__(self, key: str, task: asyncio.Future[T]) -> None:
+        self.key: str = key
+        self.task: asyncio.Future[T] = task
+        self.successor: _Flight[T] | None = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls that target the same slot.
+
+    Callers with the key of the running call share its task. A caller with a
+    different key supersedes it: the old task is cancelled and its waiters get
+    the result of the newest call instead.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight[T]] = {}
+        self.started: int = 0
+        self.shared: int = 0
+        self.superseded: int = 0
+
+    async def run(self, slot: Hashable, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(slot)
+        if flight is not None and flight.key == key and not flight.task.done():
+            self.shared += 1
+            logger.info("Joined running call: slot=%s", slot)
+        else:
+            previous = flight
+            flight = _Flight(key=key, task=asyncio.ensure_future(factory()))
+            if previous is not None and not previous.task.done():
+                self.superseded += 1
+                logger.info("Superseding running call: slot=%s", slot)
+                previous.successor = flight
+                previous.task.cancel()
+            self._flights[slot] = flight
+            flight.task.add_done_callback(
+                lambda _, slot=slot, flight=flight: self._done(slot, flight)
+            )
+            self.started += 1
+        return await self._wait(flight)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "started": self.started,
+            "shared": self.shared,
+            "superseded": self.superseded,
+            "running": len(self._flights),
+        }
+
+    async def _wait(self, flight: _Flight[T]) -> T:
+        while True:
+            try:
+                # shield: a waiter that goes away must not cancel the others' run
+                return await asyncio.shield(flight.task)
+            except asyncio.CancelledError:
+                if not flight.task.cancelled() or flight.successor is None:
+                    raise
+                flight = flight.successor
+
+    def _done(self, slot: Hashable, flight: _Flight[T]) -> None:
+        if self._flights.get(slot) is flight:
+            del self._flights[slot]
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            # every waiter may be gone; retrieving it here keeps asyncio from warning
+            logger.info("Call failed: slot=%s, error=%r", slot, flight.task.exception())
@@ -0,0 +1,26 @@
+import json
+from typing import AsyncIterator
+from pydantic import BaseModel
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # keep reverse proxies from buffering the stream
+}
+
+
+def format_sse(event: str, data: str) -> str:
+    """Encode one Server-Sent Event frame"""
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n"
+
+
+def _encode(message: BaseModel) -> str:
+    payload = message.model_dump(mode="json")
+    event = payload.pop("event")
+    return format_sse(event=event, data=json.dumps(payload.get("data"), ensure_ascii=False))
+
+
+async def sse_stream(events: AsyncIterator[BaseModel]) -> AsyncIterator[str]:
+    """Encode models with an ``event`` field and a ``data`` payload as SSE frames"""
+    async for message in events:
+        yield _encode(message)
@@ -0,0 +1,235 @@
+"""
+OpenTelemetry tracing of a request through router, service, session manager,
+agent, tool and the Zenn article path.
+
+TRACING_EXPORTER picks where finished spans go: "console" (stdout), "file"
+(one JSON span per line in TRACING_FILE) or "otlp" (a collector, configured by
+the standard OTEL_EXPORTER_OTLP_* variables; needs the otlp extra). With
+"none" no provider is installed and every span is a no-op.
+"""
+
+import asyncio
+import functools
+import os
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, TypeVar
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+
+tracer = trace.get_tracer("backend")
+
+_provider: TracerProvider | None = None
+
+
+class _JsonLinesExporter(ConsoleSpanExporter):
+    """One compact JSON object per span, appended to a file"""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "a", encoding="utf-8")
+        super().__init__(out=self._file, formatter=self._format)
+
+    @staticmethod
+    def _format(span: ReadableSpan) -> str:
+        return span.to_json(indent=None) + os.linesep
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        self._file.close()
+
+
+def configure_tracing() -> None:
+    """Install the tracer provider and exporter chosen by TRACING_EXPORTER"""
+
+    global _provider
+    if settings.TRACING_EXPORTER == "none" or _provider is not None:
+        return
+
+    exporter: SpanExporter
+    if settings.TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    elif settings.TRACING_EXPORTER == "file":
+        exporter = _JsonLinesExporter(settings.TRACING_FILE)
+    else:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            raise RuntimeError(
+                "TRACING_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http,"
+                " install the otlp extra"
+            ) from e
+        exporter = OTLPSpanExporter()
+
+    # the sampler follows OTEL_TRACES_SAMPLER / OTEL_TRACES_SAMPLER_ARG, default always on
+    _provider = TracerProvider(
+        resource=Resource.create({SERVICE_NAME: settings.TRACING_SERVICE_NAME})
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info("Tracing enabled: exporter=%s", settings.TRACING_EXPORTER)
+
+
+def shutdown_tracing() -> None:
+    """Export the spans still buffered and close the exporter"""
+
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def traced(name: str, **attributes: Any) -> Callable[[F], F]:
+    """Run a sync or async function in a span, recording the exception it raises"""
+
+    def decorator(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.start_as_current_span(name, attributes=attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(name, attributes=attributes):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@contextmanager
+def stream_span(name: str, parent: Span | None = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Span for the body of an async generator.
+
+    The span is not made current: a generator can be resumed or closed in
+    another context (e.g. by the asyncio finalizer) where detaching it would
+    fail. Wrap code that starts child work, without a yield in between, in
+    trace.use_span(span).
+    """
+
+    context = trace.set_span_in_context(parent) if parent is not None else None
+    span = tracer.start_span(name, context=context, attributes=_clean(attributes))
+    try:
+        yield span
+    except Exception as e:
+        span.record_exception(e)
+        set_error(span, f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        span.end()
+
+
+async def iterate_in_span(span: Span, iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+    """Make span current during each step of iterator, so the spans it starts are children"""
+
+    while True:
+        # attached and detached within one step, never across a yield; errors are
+        # left to the owner of the span, which may turn them into an event
+        with trace.use_span(span, record_exception=False, set_status_on_exception=False):
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                return
+        yield item
+
+
+def set_attributes(span: Span | None = None, **attributes: Any) -> None:
+    """Set attributes on the span (the current one by default), skipping None values"""
+
+    (span or trace.get_current_span()).set_attributes(_clean(attributes))
+
+
+def set_llm_attributes(
+    span: Span | None, model: str, stop_reason: str | None = None, usage: Any = None
+) -> None:
+    """Model, stop reason and token counts of one LLM response, by GenAI conventions"""
+
+    attributes: Dict[str, Any] = {
+        "gen_ai.request.model": model,
+        "gen_ai.response.finish_reasons": [stop_reason] if stop_reason else None,
+    }
+    if usage is not None:
+        attributes["gen_ai.usage.input_tokens"] = getattr(usage, "input_tokens", None)
+        attributes["gen_ai.usage.output_tokens"] = getattr(usage, "output_tokens", None)
+        attributes["gen_ai.usage.cache_read_input_tokens"] = getattr(
+            usage, "cache_read_input_tokens", None
+        )
+        attributes["gen_ai.usage.cache_creation_input_tokens"] = getattr(
+            usage, "cache_creation_input_tokens", None
+        )
+    (span or trace.get_current_span()).set_attributes(_clean(attributes))
+
+
+def set_error(span: Span | None, message: str) -> None:
+    """Mark the span failed, e.g. for an error sent to the client as an event"""
+
+    (span or trace.get_current_span()).set_status(Status(StatusCode.ERROR, message))
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+class TracingMiddleware:
+    """
+    Server span per HTTP request, continuing a trace sent in a traceparent
+    header. Named by route template once routing is done; SSE streams stay
+    inside it until the last event is sent.
+
+    FastAPI versions with native OpenTelemetry support (and the contrib ASGI
+    instrumentation) already open a server span; requests are then passed
+    through so every trace keeps a single root.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _in_server_span():
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]
+        }
+        method = scope["method"]
+        with tracer.start_as_current_span(
+            method,
+            context=propagate.extract(headers),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    span.set_attribute("http.route", route)
+                    span.update_name(f"{method} {route}")
+
+
+def _in_server_span() -> bool:
+    span = trace.get_current_span()
+    return span.is_recording() and getattr(span, "kind", None) == SpanKind.SERVER
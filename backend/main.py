@@ -1,20 +1,40 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from backend.routers import suggest
+from backend.routers import jobs, metrics, suggest
 from backend.zenn import generate
 from backend.core.logger import configure_logging, get_logger
+from backend.core.metrics import MetricsMiddleware
+from backend.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
 from backend.zenn import publish
+from backend.zenn import articles
+from backend.zenn.article_index import article_index
+from backend.core.clients import client_registry
 from backend.core.database import database
+from backend.session.session_cache import session_cache
+from backend.session.session_manager import SessionManager
+from backend.services.job_service import job_queue
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     configure_logging(level="DEBUG")
     logger = get_logger(__name__)
+    configure_tracing()
     database.create_tables()
+    async with database.async_session_scope() as db:
+        await SessionManager(db=db).migrate_legacy_sessions()
+    client_registry.start()
+    await session_cache.start()
+    article_index.build()
+    job_queue.start()
 
     logger.info("Connected to DataBase")
     yield
+    job_queue.stop()
+    await session_cache.stop()
+    await database.dispose()
+    await client_registry.aclose()
+    shutdown_tracing()
     logger.info("Application shutdown")
 
 
@@ -24,6 +44,8 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 
 @app.get("/")
@@ -34,7 +56,10 @@ async def root():
 
 app.include_router(generate.router)
 app.include_router(publish.router)
+app.include_router(articles.router)
 app.include_router(suggest.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 logger = get_logger(__name__)
 logger.info("FastAPI application started successfully")
@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, JSON, DateTime
+from sqlalchemy.orm import mapped_column
+from backend.models.session_model import Base
+
+
+class AgentConversationModel(Base):
+    """SuggestAgentの会話履歴(session単位)のテーブルモデル"""
+
+    __tablename__ = "agent_conversation"
+    session_id = mapped_column(
+        String(36),
+        primary_key=True,
+    )
+    messages = mapped_column(
+        JSON,
+        default=list,
+    )
+    section_digests = mapped_column(
+        JSON,
+        default=dict,
+    )
+    context_digest = mapped_column(
+        String(64),
+        default="",
+    )
+    summaries = mapped_column(
+        JSON,
+        default=list,
+    )
+    turns = mapped_column(Integer, default=0, nullable=False)
+    updated_at = mapped_column(
+        DateTime, default=datetime.now, onupdate=datetime.now, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<AgentConversation(session_id={self.session_id}, turns={self.turns})>"
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, JSON, DateTime, Integer, Text
+from sqlalchemy.orm import mapped_column
+from backend.models.session_model import Base
+
+
+class JobModel(Base):
+    """バックグラウンドジョブ(記事生成・公開)のテーブルモデル"""
+
+    __tablename__ = "job"
+    job_id = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+    )
+    kind = mapped_column(
+        String(32),
+        nullable=False,
+    )
+    priority = mapped_column(Integer, default=0, nullable=False)  # higher runs first
+    status = mapped_column(
+        String(16),
+        default="queued",
+        nullable=False,
+        index=True,
+    )  # queued -> running -> succeeded / failed
+    payload = mapped_column(
+        JSON,
+        default=dict,
+    )
+    result = mapped_column(
+        JSON,
+        nullable=True,
+    )
+    error = mapped_column(
+        Text,
+        nullable=True,
+    )
+    # process running the job and until when it holds it; renewed while it runs
+    owner = mapped_column(String(32), nullable=True)
+    lease_expires_at = mapped_column(DateTime, nullable=True)
+    created_at = mapped_column(DateTime, default=datetime.now, nullable=False)
+    started_at = mapped_column(DateTime, nullable=True)
+    finished_at = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<Job(job_id={self.job_id}, kind={self.kind}, status={self.status})>"
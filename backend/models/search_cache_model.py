@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import String, Text, JSON, DateTime
+from sqlalchemy.orm import mapped_column
+from backend.models.session_model import Base
+
+
+class WebSearchCacheModel(Base):
+    """WebSearchAgentの検索結果キャッシュのテーブルモデル"""
+
+    __tablename__ = "web_search_cache"
+    query_key = mapped_column(
+        String(64),
+        primary_key=True,
+    )
+    query = mapped_column(
+        Text,
+        nullable=False,
+    )
+    search_result = mapped_column(
+        Text,
+        nullable=False,
+    )
+    related_links = mapped_column(
+        JSON,
+        default=list,
+    )
+    created_at = mapped_column(DateTime, default=datetime.now, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<WebSearchCache(query_key={self.query_key}, query={self.query})>"
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, JSON, DateTime
+from sqlalchemy import String, JSON, DateTime, Integer, Text, ForeignKey
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -23,6 +23,7 @@ class WritingSessionModel(Base):
     target_audience = mapped_column(
         String(50),
     )
+    # legacy whole-document columns, sections now live in writing_section
     outline = mapped_column(
         JSON,
         default=list,
@@ -38,3 +39,39 @@ class WritingSessionModel(Base):
 
     def __repr__(self) -> str:
         return f"<WritingSession(session_id={self.session_id}, topic={self.topic})>)"
+
+
+class WritingSectionModel(Base):
+    """WritingSessionの目次項目ごとの内容のテーブルモデル"""
+
+    __tablename__ = "writing_section"
+    session_id = mapped_column(
+        String(36),
+        ForeignKey("writing_session.session_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Text like the JSON columns it replaces: ids and titles of any length
+    section_id = mapped_column(
+        Text,
+        primary_key=True,
+    )
+    # outline fields are NULL for content that has no outline entry
+    title = mapped_column(
+        Text,
+    )
+    level = mapped_column(
+        Integer,
+    )
+    order = mapped_column(
+        Integer,
+    )
+    # NULL when the outline entry has no content yet
+    content = mapped_column(
+        Text,
+    )
+    updated_at = mapped_column(
+        DateTime, default=datetime.now, onupdate=datetime.now, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<WritingSection(session_id={self.session_id}, section_id={self.section_id})>"
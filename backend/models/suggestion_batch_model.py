@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import String, JSON, DateTime
+from sqlalchemy.orm import mapped_column
+from backend.models.session_model import Base
+
+
+class SuggestionBatchModel(Base):
+    """オフラインのバッチ提案(Message Batches)のテーブルモデル"""
+
+    __tablename__ = "suggestion_batch"
+    batch_id = mapped_column(
+        String(64),
+        primary_key=True,
+    )
+    session_id = mapped_column(
+        String(36),
+        nullable=False,
+        index=True,
+    )
+    section_ids = mapped_column(
+        JSON,
+        default=list,
+    )  # section_ids[i] answers the request with custom_id "section-{i}"
+    backend = mapped_column(
+        String(16),
+        nullable=False,
+    )
+    created_at = mapped_column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SuggestionBatch(batch_id={self.batch_id}, session_id={self.session_id})>"
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException
+from backend.schemas.job_schemas import JobResponse
+from backend.services.job_service import job_queue
+from backend.zenn.zenn_article_schemas import (
+    AIGenerateRequest,
+    GenerateRequest,
+    PublishBatchRequest,
+    PublishRequest,
+)
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.post("/generate")
+def enqueue_generate(req: GenerateRequest, priority: int = 0) -> JobResponse:
+    """
+    記事の作成をバックグラウンドで実行する
+
+    :param priority: Higher runs first
+    :return: The queued job, poll GET /jobs/{job_id} for the result
+    :rtype: JobResponse
+    """
+
+    return job_queue.submit(kind="generate", payload=req.model_dump(), priority=priority)
+
+
+@router.post("/generate/openai")
+def enqueue_generate_openai(req: AIGenerateRequest, priority: int = 0) -> JobResponse:
+    """OpenAIでの記事生成をバックグラウンドで実行する"""
+
+    return job_queue.submit(kind="generate_openai", payload=req.model_dump(), priority=priority)
+
+
+@router.post("/publish")
+def enqueue_publish(req: PublishRequest, priority: int = 0) -> JobResponse:
+    """記事の公開をバックグラウンドで実行する"""
+
+    return job_queue.submit(kind="publish", payload=req.model_dump(), priority=priority)
+
+
+@router.post("/publish/batch")
+def enqueue_publish_batch(req: PublishBatchRequest, priority: int = 0) -> JobResponse:
+    """複数記事の公開をバックグラウンドで実行する"""
+
+    return job_queue.submit(kind="publish_batch", payload=req.model_dump(), priority=priority)
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str) -> JobResponse:
+    """
+    ジョブの状態と結果を取得する
+
+    :raises HTTPException: If the job does not exist
+    """
+
+    job: JobResponse | None = job_queue.get_job(job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
@@ -1,17 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 import time
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.schemas.assistant_schemas import (
     WritingInfo,
+    BatchSuggestionRequest,
+    BatchSuggestionStatus,
     SuggestionRequest,
     SuggestionResponse,
     CreateSessionResponse,
     WritingSession,
+    CacheStatsResponse,
+    SectionPatchRequest,
+    UpdatedSectionResponse,
 )
-from backend.services.suggest_service import SuggestService
+from backend.exceptions.exceptions import AgentException, SessionException
+from backend.agents.search_cache import web_search_cache
+from backend.services.suggest_service import SuggestService, suggestion_cache
+from backend.session.session_cache import session_cache
 from backend.session.session_manager import SessionManager
-from backend.core.database import get_db
+from backend.core.clients import ClientRegistry, get_clients
+from backend.core.database import get_async_db
 from backend.core.logger import get_logger
+from backend.core.sse import SSE_HEADERS, sse_stream
+from backend.core.tracing import set_attributes
 
 logger = get_logger(__name__)
 
@@ -19,17 +31,18 @@ router = APIRouter(prefix="/assist", tags=["assist"])
 
 
 @router.post("/begin")
-def begin_session(
+async def begin_session(
     writing_info: WritingInfo,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> CreateSessionResponse:
     start = time.perf_counter()
     logger.info("Creating session with topic: %s", writing_info.topic)
     session_manager: SessionManager = SessionManager(db=db)
 
-    session_response: CreateSessionResponse = session_manager.create_session(
+    session_response: CreateSessionResponse = await session_manager.create_session(
         topic=writing_info.topic
     )
+    set_attributes(session_id=session_response.session_id)
     elapsed = time.perf_counter() - start
     logger.info(
         "Session created: session_id=%s, elapsed=%.2fs", session_response.session_id, elapsed
@@ -38,19 +51,29 @@ def begin_session(
 
 
 @router.post("/suggest")
-def assist_writing(
+async def assist_writing(
     suggest_request: SuggestionRequest,
     writing_session: WritingSession,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    clients: ClientRegistry = Depends(get_clients),
 ) -> SuggestionResponse:
     start = time.perf_counter()
     logger.info("Generating suggestion: session_id=%s", suggest_request.session_id)
-    suggest_service: SuggestService = SuggestService(db=db)
-
-    response: SuggestionResponse = suggest_service.generate_suggestion(
-        suggest_request=suggest_request,
-        writing_session=writing_session,
+    set_attributes(
+        session_id=suggest_request.session_id, section_id=suggest_request.current_section_id
     )
+    suggest_service: SuggestService = SuggestService(db=db, clients=clients)
+
+    try:
+        response: SuggestionResponse = await suggest_service.generate_suggestion(
+            suggest_request=suggest_request,
+            writing_session=writing_session,
+        )
+    except SessionException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
     elapsed = time.perf_counter() - start
     logger.info(
         "Suggestion generated: session_id=%s, elapsed=%.2fs",
@@ -60,13 +83,188 @@ def assist_writing(
     return response
 
 
+@router.post("/suggest/stream")
+async def assist_writing_stream(
+    suggest_request: SuggestionRequest,
+    writing_session: WritingSession,
+    db: AsyncSession = Depends(get_async_db),
+    clients: ClientRegistry = Depends(get_clients),
+) -> StreamingResponse:
+    """Stream searching / related_links / suggestion / summary_report events over SSE"""
+    logger.info("Streaming suggestion: session_id=%s", suggest_request.session_id)
+    set_attributes(
+        session_id=suggest_request.session_id, section_id=suggest_request.current_section_id
+    )
+    suggest_service: SuggestService = SuggestService(db=db, clients=clients)
+
+    try:
+        events = await suggest_service.stream_suggestion(
+            suggest_request=suggest_request,
+            writing_session=writing_session,
+        )
+    except SessionException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post("/suggest/batch")
+async def assist_writing_batch(
+    batch_request: BatchSuggestionRequest,
+    writing_session: WritingSession,
+    db: AsyncSession = Depends(get_async_db),
+    clients: ClientRegistry = Depends(get_clients),
+) -> StreamingResponse:
+    """Suggest for many sections concurrently, streaming a section event as each finishes"""
+    logger.info(
+        "Streaming batch suggestion: session_id=%s, sections=%s",
+        batch_request.session_id,
+        len(batch_request.section_ids),
+    )
+    set_attributes(session_id=batch_request.session_id, sections=len(batch_request.section_ids))
+    suggest_service: SuggestService = SuggestService(db=db, clients=clients)
+
+    try:
+        events = await suggest_service.stream_batch_suggestion(
+            batch_request=batch_request,
+            writing_session=writing_session,
+        )
+    except SessionException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post("/suggest/batch/offline")
+async def submit_batch(
+    batch_request: BatchSuggestionRequest,
+    writing_session: WritingSession,
+    db: AsyncSession = Depends(get_async_db),
+    clients: ClientRegistry = Depends(get_clients),
+) -> BatchSuggestionStatus:
+    """Submit the sections to the Message Batches API, poll the result with GET"""
+    logger.info("Submitting batch suggestion: session_id=%s", batch_request.session_id)
+    set_attributes(session_id=batch_request.session_id, sections=len(batch_request.section_ids))
+    suggest_service: SuggestService = SuggestService(db=db, clients=clients)
+
+    try:
+        return await suggest_service.submit_batch_suggestion(
+            batch_request=batch_request,
+            writing_session=writing_session,
+        )
+    except SessionException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
+
+
+@router.get("/suggest/batch/{batch_id}")
+async def get_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    clients: ClientRegistry = Depends(get_clients),
+) -> BatchSuggestionStatus:
+    set_attributes(batch_id=batch_id)
+    suggest_service: SuggestService = SuggestService(db=db, clients=clients)
+
+    try:
+        return await suggest_service.get_batch_suggestion(batch_id=batch_id)
+    except AgentException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
+
+
 @router.post("/update")
-def update_writing(
+async def update_writing(
     writing_session: WritingSession,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    clients: ClientRegistry = Depends(get_clients),
 ):
     logger.info("Updating session: session_id=%s", writing_session.session_id)
-    suggest_service: SuggestService = SuggestService(db=db)
+    set_attributes(session_id=writing_session.session_id)
+    suggest_service: SuggestService = SuggestService(db=db, clients=clients)
 
-    response = suggest_service.update_session(writing_session=writing_session)
+    try:
+        response = await suggest_service.update_session(writing_session=writing_session)
+    except SessionException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
     return response
+
+
+@router.get("/sessions/{session_id}")
+async def get_writing_session(
+    session_id: str,
+    db: AsyncSession = Depends(get_async_db),
+) -> WritingSession:
+    """Return the stored session; hot sessions are served from the session cache"""
+    set_attributes(session_id=session_id)
+    session_manager: SessionManager = SessionManager(db=db)
+
+    try:
+        return await session_manager.get_session(session_id=session_id)
+    except SessionException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
+
+
+@router.patch("/sessions/{session_id}/sections/{section_id}")
+async def patch_section(
+    session_id: str,
+    section_id: str,
+    section_patch: SectionPatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+) -> UpdatedSectionResponse:
+    """Update one section of a session without sending the whole WritingSession"""
+    logger.info("Patching section: session_id=%s, section_id=%s", session_id, section_id)
+    set_attributes(session_id=session_id, section_id=section_id)
+    session_manager: SessionManager = SessionManager(db=db)
+
+    try:
+        return await session_manager.patch_section(
+            session_id=session_id,
+            section_id=section_id,
+            section_patch=section_patch,
+        )
+    except SessionException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={"message": e.message, "endpoint": e.endpoint},
+        ) from e
+
+
+@router.get("/search-cache")
+def search_cache_stats() -> CacheStatsResponse:
+    """Hit/miss counters of the web search cache"""
+    return CacheStatsResponse(**web_search_cache.stats())
+
+
+@router.get("/suggestion-cache")
+def suggestion_cache_stats() -> CacheStatsResponse:
+    """Hit/miss counters of the suggestion cache"""
+    return CacheStatsResponse(**suggestion_cache.stats())
+
+
+@router.get("/session-cache")
+def session_cache_stats() -> CacheStatsResponse:
+    """Hit/miss counters and memory use of the session cache"""
+    return CacheStatsResponse(**session_cache.stats())
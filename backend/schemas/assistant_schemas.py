@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict, Literal, List
+from typing import Any, Dict, Literal, List
 from datetime import datetime
 
 
@@ -13,6 +13,12 @@ class UpdatedSessionResponse(BaseModel):
     session_id: str | None
 
 
+class UpdatedSectionResponse(BaseModel):
+    status: Literal["success", "fail"]
+    session_id: str
+    section_id: str
+
+
 class WritingInfo(BaseModel):
     topic: str
     target_audience: Literal["beginner", "intermediate", "advance"] | None = None
@@ -35,10 +41,20 @@ class WritingSession(BaseModel):
     updated_at: datetime
 
 
+class SectionPatchRequest(BaseModel):
+    """Fields to change on one section, omitted fields are left as they are"""
+
+    title: str | None = None
+    level: int | None = None
+    order: int | None = None
+    content: str | None = None
+
+
 class SuggestionRequest(BaseModel):
     session_id: str
     current_section_id: str
     current_content: str
+    bypass_cache: bool = False
 
 
 class Suggestion(BaseModel):
@@ -67,6 +83,35 @@ class SuggestionResponse(BaseModel):
     summary_report: str
 
 
+class SuggestionStreamEvent(BaseModel):
+    event: Literal["searching", "related_links", "suggestion", "summary_report", "done", "error"]
+    data: str | Suggestion | List[RelatedLink] | SuggestionResponse | None = None
+
+
+class BatchSuggestionRequest(BaseModel):
+    session_id: str
+    section_ids: List[str]  # current_content of each is taken from writing_session.content
+    bypass_cache: bool = False
+
+
+class SectionSuggestionResult(BaseModel):
+    section_id: str
+    status: Literal["succeeded", "failed"]
+    response: SuggestionResponse | None = None
+    error: str | None = None
+
+
+class BatchSuggestionEvent(BaseModel):
+    event: Literal["section", "done"]
+    data: SectionSuggestionResult | None = None
+
+
+class BatchSuggestionStatus(BaseModel):
+    batch_id: str
+    status: Literal["in_progress", "ended"]
+    results: List[SectionSuggestionResult] = []
+
+
 class WebSearchResponse(BaseModel):
     search_result: str
     related_links: List[RelatedLink]
@@ -75,3 +120,21 @@ class WebSearchResponse(BaseModel):
 class CreateSession(BaseModel):
     session_id: str
     topic: str
+
+
+class AgentConversation(BaseModel):
+    session_id: str
+    messages: List[Dict[str, Any]] = []  # MessageParam dicts, oldest first
+    section_digests: Dict[str, str] = {}  # {"section_id": "digest of sent content"}
+    context_digest: str = ""  # digest of topic, target_audience and outline
+    summaries: List[str] = []  # summary_report of earlier turns
+    turns: int = 0
+
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+    persistent_hits: int = 0
+    bytes: int | None = None
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Any, Dict, Literal
+from pydantic import BaseModel
+
+JobKind = Literal["generate", "generate_openai", "publish", "publish_batch"]
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: JobKind
+    status: JobStatus
+    priority: int
+    result: Dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
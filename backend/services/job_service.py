@@ -0,0 +1,204 @@
+import itertools
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from backend.core.database import database
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+from backend.core.tracing import set_error, tracer
+from backend.models.job_model import JobModel
+from backend.schemas.job_schemas import JobKind, JobResponse
+from backend.session.job_manager import JobManager
+from backend.zenn.generate_service import GenerateService
+from backend.zenn.publish_service import PublishService
+from backend.zenn.zenn_article_schemas import (
+    AIGenerateRequest,
+    GenerateRequest,
+    PublishBatchRequest,
+    PublishRequest,
+)
+
+logger = get_logger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _handlers() -> Dict[str, JobHandler]:
+    generator = GenerateService()
+    publisher = PublishService()
+    return {
+        "generate": lambda payload: generator.generate_article(
+            article_info=GenerateRequest(**payload)
+        ).model_dump(),
+        "generate_openai": lambda payload: generator.generate_openai(
+            req=AIGenerateRequest(**payload)
+        ).model_dump(),
+        "publish": lambda payload: publisher.publish_article(
+            req=PublishRequest(**payload)
+        ).model_dump(),
+        "publish_batch": lambda payload: publisher.publish_articles(
+            req=PublishBatchRequest(**payload)
+        ).model_dump(),
+    }
+
+
+class JobQueue:
+    """
+    Bounded pool of worker threads for article generation and publishing.
+
+    Jobs are stored before they are queued and claimed with a conditional
+    UPDATE, so each run belongs to one process. The claim holds a lease that a
+    heartbeat renews while the job runs; only jobs whose lease expired (their
+    process died) are queued again, so several processes and overlapping
+    restarts can share the table. Delivery is at least once: a job whose
+    process died mid-run runs again. Publishing is idempotent (an article
+    already published and pushed gives no new commit); generating may create
+    the article a second time. Higher priority runs first, then oldest first.
+    """
+
+    def __init__(self) -> None:
+        self._session_local: sessionmaker[Session] | None = None
+        self._owner: str = uuid.uuid4().hex
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._workers: List[threading.Thread] = []
+        self._heartbeat: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._handlers: Dict[str, JobHandler] = _handlers()
+
+    def start(self) -> None:
+        if settings.JOB_DATABASE_URL:
+            # jobs can live in their own database so the queue survives app DB maintenance
+            engine = create_engine(settings.JOB_DATABASE_URL, pool_pre_ping=True)
+            JobModel.__table__.create(engine, checkfirst=True)
+            self._session_local = sessionmaker(autoflush=False, bind=engine)
+
+        with self._session_scope() as db:
+            job_manager = JobManager(db=db)
+            requeued = job_manager.reclaim_expired()
+            pending = job_manager.queued_jobs()
+        for job_id, priority in pending:
+            self._put(job_id, priority)
+        logger.info("Job queue started: pending=%s, requeued=%s", len(pending), len(requeued))
+
+        self._stopping.clear()
+        for index in range(settings.JOB_WORKERS):
+            worker = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Let running jobs finish, queued ones stay in the table for the next start"""
+        for _ in self._workers:
+            self._queue.put((float("-inf"), -1, None))
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self._workers.clear()
+        # stop renewing last, so jobs still running past the timeout keep their lease
+        self._stopping.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=timeout)
+            self._heartbeat = None
+
+    def submit(self, kind: JobKind, payload: Dict[str, Any], priority: int = 0) -> JobResponse:
+        with self._session_scope() as db:
+            job = JobManager(db=db).create_job(kind=kind, payload=payload, priority=priority)
+        self._put(job.job_id, priority)
+        return job
+
+    def get_job(self, job_id: str) -> JobResponse | None:
+        with self._session_scope() as db:
+            return JobManager(db=db).get_job(job_id=job_id)
+
+    def _beat(self) -> None:
+        """Renew the leases of the jobs running here, take over jobs of dead processes"""
+        interval = settings.JOB_LEASE_SECONDS / 3
+        while not self._stopping.wait(interval):
+            try:
+                with self._session_scope() as db:
+                    job_manager = JobManager(db=db)
+                    job_manager.renew_leases(
+                        owner=self._owner, lease_seconds=settings.JOB_LEASE_SECONDS
+                    )
+                    reclaimed = job_manager.reclaim_expired()
+            except Exception:
+                logger.exception("Job heartbeat failed")
+                continue
+            for job_id, priority in reclaimed:
+                logger.warning("Requeued job with expired lease: job_id=%s", job_id)
+                self._put(job_id, priority)
+
+    def _put(self, job_id: str, priority: int) -> None:
+        self._queue.put((-priority, next(self._order), job_id))
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception:
+                logger.exception("Job worker failed: job_id=%s", job_id)
+
+    def _run(self, job_id: str) -> None:
+        with self._session_scope() as db:
+            claimed = JobManager(db=db).claim_job(
+                job_id=job_id, owner=self._owner, lease_seconds=settings.JOB_LEASE_SECONDS
+            )
+        if claimed is None:
+            return
+        kind, payload = claimed
+
+        logger.info("Running job: job_id=%s, kind=%s", job_id, kind)
+        result: Dict[str, Any] | None = None
+        error: str | None = None
+        # a trace of its own: the request that queued the job is long finished
+        with tracer.start_as_current_span(
+            f"job.{kind}", attributes={"job_id": job_id, "job_kind": kind}
+        ) as span:
+            try:
+                result = self._handlers[kind](payload)
+            except Exception as e:
+                logger.exception("Job failed: job_id=%s", job_id)
+                error = f"{type(e).__name__}: {e}"
+                span.record_exception(e)
+                set_error(span, error)
+
+        with self._session_scope() as db:
+            finished = JobManager(db=db).finish_job(
+                job_id=job_id,
+                owner=self._owner,
+                result=result,
+                error=str(error) if error else None,
+            )
+        if not finished:
+            logger.warning("Lost the lease of job, result dropped: job_id=%s", job_id)
+            return
+        logger.info("Finished job: job_id=%s, failed=%s", job_id, error is not None)
+
+    @contextmanager
+    def _session_scope(self) -> Iterator[Session]:
+        if self._session_local is None:
+            with database.session_scope() as session:
+                yield session
+            return
+
+        session = self._session_local()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+job_queue: JobQueue = JobQueue()
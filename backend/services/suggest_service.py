@@ -1,30 +1,102 @@
-from sqlalchemy.orm import Session
+import asyncio
+import hashlib
+import json
+import re
+from contextlib import aclosing
+from typing import AsyncIterator, List, Tuple
+from anthropic.types.messages.batch_create_params import Request
+from opentelemetry import trace
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.session.session_manager import SessionManager
+from backend.session.conversation_manager import ConversationManager
+from backend.session.batch_manager import BatchManager
+from backend.core.database import database
 from backend.agents.suggestion_agent import SuggestAgent
+from backend.agents.suggestion_batch import suggestion_batch_backend
 from backend.schemas.assistant_schemas import (
+    AgentConversation,
+    BatchSuggestionEvent,
+    BatchSuggestionRequest,
+    BatchSuggestionStatus,
+    SectionSuggestionResult,
     WritingSession,
     SuggestionResponse,
     SuggestionRequest,
     UpdatedSessionResponse,
+    SuggestionStreamEvent,
+)
+from backend.exceptions.exceptions import AgentException
+from backend.core.cache import TTLCache
+from backend.core.clients import ClientRegistry
+from backend.core.single_flight import SingleFlight
+from backend.core.settings import settings
+from backend.core.tracing import (
+    iterate_in_span,
+    set_attributes,
+    set_error,
+    stream_span,
+    traced,
 )
 from backend.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+_WHITESPACE = re.compile(r"\s+")
+
+suggestion_cache: TTLCache[str, SuggestionResponse] = TTLCache(
+    maxsize=settings.SUGGESTION_CACHE_SIZE,
+    ttl=settings.SUGGESTION_CACHE_TTL_SECONDS,
+)
+
+# one agent run per (session_id, current_section_id); keystroke bursts share or supersede it
+suggestion_flights: SingleFlight[SuggestionResponse] = SingleFlight()
+
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def build_suggestion_key(
+    writing_session: WritingSession, current_section_id: str, current_content: str
+) -> str:
+    """Hash the parts of a request that affect the suggestion, ignoring whitespace edits"""
+    payload = {
+        "topic": _normalize_text(writing_session.topic),
+        "target_audience": _normalize_text(writing_session.target_audience).casefold(),
+        "outline": [
+            [section.section_id, _normalize_text(section.title), section.level, section.order]
+            for section in sorted(writing_session.outline, key=lambda s: s.order)
+        ],
+        "content": {
+            section_id: _normalize_text(text)
+            for section_id, text in writing_session.content.items()
+        },
+        "current_section_id": current_section_id,
+        "current_content": _normalize_text(current_content),
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
 
 # refactor: thre are complex roule each function may access by id or obj...
 class SuggestService:
     """agentとsessionを定義する"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, clients: ClientRegistry):
+        self._db: AsyncSession = db
+        self._clients: ClientRegistry = clients
         self._session_manager: SessionManager = SessionManager(db=db)
-        self._suggest_agent: SuggestAgent = SuggestAgent()
+        self._conversation_manager: ConversationManager = ConversationManager(db=db)
+        self._batch_manager: BatchManager = BatchManager(db=db)
+        self._suggest_agent: SuggestAgent = SuggestAgent(client=clients.anthropic)
 
-    def update_session(
+    @traced("suggest_service.update_session")
+    async def update_session(
         self,
         writing_session: WritingSession,
     ) -> UpdatedSessionResponse:
-        result = self._session_manager.update_session(
+        result = await self._session_manager.update_session(
             writing_session=writing_session,
         )
 
@@ -37,25 +109,368 @@ class SuggestService:
             logger.info("Failed to update: session_id=%s", writing_session.session_id)
             return res
 
-    def generate_suggestion(
+    @traced("suggest_service.generate_suggestion")
+    async def generate_suggestion(
         self,
         suggest_request: SuggestionRequest,
         writing_session: WritingSession,
     ) -> SuggestionResponse:
-        # refact: is this right to save session in this point? This is insane...(db up and get)
-        logger.info("Update session to generate suggestion")
-        self.update_session(writing_session=writing_session)
+        cache_key, cached_response, _writing_session = await self._prepare_suggestion(
+            suggest_request=suggest_request,
+            writing_session=writing_session,
+        )
+        if cached_response is not None:
+            return cached_response
 
-        logger.info("Fetch session to generate suggestion")
-        _writing_session: WritingSession = self._session_manager.get_session(
-            session_id=suggest_request.session_id,
+        # end the transaction so no connection is held while waiting for the agent
+        await self._db.commit()
+        return await suggestion_flights.run(
+            slot=(suggest_request.session_id, suggest_request.current_section_id),
+            key=cache_key,
+            factory=lambda: self._run_suggestion(
+                cache_key=cache_key,
+                writing_session=_writing_session,
+                suggest_request=suggest_request,
+            ),
         )
 
-        logger.info("Generating suggestion")
-        response: SuggestionResponse = self._suggest_agent.generate_suggestion(
+    @traced("suggest_service.stream_suggestion")
+    async def stream_suggestion(
+        self,
+        suggest_request: SuggestionRequest,
+        writing_session: WritingSession,
+    ) -> AsyncIterator[SuggestionStreamEvent]:
+        """Do the DB work up front and return the event stream of the agent run"""
+        cache_key, cached_response, _writing_session = await self._prepare_suggestion(
+            suggest_request=suggest_request,
+            writing_session=writing_session,
+        )
+        if cached_response is not None:
+            return self._replay_suggestion(cached_response)
+
+        conversation: AgentConversation = await self._fetch_conversation(suggest_request.session_id)
+        return self._stream_agent(
+            cache_key=cache_key,
             writing_session=_writing_session,
+            conversation=conversation,
+            suggest_request=suggest_request,
+        )
+
+    @traced("suggest_service.stream_batch_suggestion")
+    async def stream_batch_suggestion(
+        self,
+        batch_request: BatchSuggestionRequest,
+        writing_session: WritingSession,
+    ) -> AsyncIterator[BatchSuggestionEvent]:
+        """Save the session once and return the stream of per-section results"""
+        _writing_session: WritingSession = await self._session_manager.save_session(
+            writing_session=writing_session
+        )
+        # end the transaction so no connection is held during the agent runs
+        await self._db.commit()
+        return self._run_batch(batch_request=batch_request, writing_session=_writing_session)
+
+    @traced("suggest_service.submit_batch_suggestion")
+    async def submit_batch_suggestion(
+        self,
+        batch_request: BatchSuggestionRequest,
+        writing_session: WritingSession,
+    ) -> BatchSuggestionStatus:
+        """Submit one single-shot request per section to the offline batch backend"""
+        _writing_session: WritingSession = await self._session_manager.save_session(
+            writing_session=writing_session
+        )
+        section_ids: List[str] = list(dict.fromkeys(batch_request.section_ids))
+        requests: List[Request] = [
+            {
+                "custom_id": f"section-{index}",
+                "params": self._suggest_agent.build_batch_params(
+                    writing_session=_writing_session,
+                    current_section_id=section_id,
+                    current_content=_writing_session.content.get(section_id, ""),
+                ),
+            }
+            for index, section_id in enumerate(section_ids)
+            if self._has_section(_writing_session, section_id)
+        ]
+        batch_id = await suggestion_batch_backend.submit(requests)
+        await self._batch_manager.create_batch(
+            batch_id=batch_id,
+            session_id=_writing_session.session_id,
+            section_ids=section_ids,
+            backend=suggestion_batch_backend.name,
+        )
+        return BatchSuggestionStatus(batch_id=batch_id, status="in_progress")
+
+    @traced("suggest_service.get_batch_suggestion")
+    async def get_batch_suggestion(self, batch_id: str) -> BatchSuggestionStatus:
+        batch = await self._batch_manager.get_batch(batch_id=batch_id)
+        if batch is None or batch.backend != suggestion_batch_backend.name:
+            raise AgentException(
+                message=f"Batch {batch_id} not found",
+                endpoint="/assist",
+                status_code=404,
+            )
+
+        ended, outputs = await suggestion_batch_backend.retrieve(batch_id)
+        if not ended:
+            return BatchSuggestionStatus(batch_id=batch_id, status="in_progress")
+
+        results: List[SectionSuggestionResult] = []
+        for index, section_id in enumerate(batch.section_ids):
+            output = outputs.get(f"section-{index}", "No result for this section")
+            if isinstance(output, str):
+                results.append(
+                    SectionSuggestionResult(section_id=section_id, status="failed", error=output)
+                )
+                continue
+            try:
+                response = self._suggest_agent.parse_message(output)
+            except AgentException as e:
+                results.append(
+                    SectionSuggestionResult(section_id=section_id, status="failed", error=e.message)
+                )
+            except ValidationError:
+                results.append(
+                    SectionSuggestionResult(
+                        section_id=section_id, status="failed", error="Invalid suggestion format"
+                    )
+                )
+            else:
+                results.append(
+                    SectionSuggestionResult(
+                        section_id=section_id, status="succeeded", response=response
+                    )
+                )
+        return BatchSuggestionStatus(batch_id=batch_id, status="ended", results=results)
+
+    async def _prepare_suggestion(
+        self,
+        suggest_request: SuggestionRequest,
+        writing_session: WritingSession,
+    ) -> Tuple[str, SuggestionResponse | None, WritingSession]:
+        # one update ... returning: the stored row comes back without a reread
+        logger.info("Save session to generate suggestion")
+        _writing_session: WritingSession = await self._session_manager.save_session(
+            writing_session=writing_session
+        )
+
+        cache_key = build_suggestion_key(
+            writing_session=writing_session,
             current_section_id=suggest_request.current_section_id,
             current_content=suggest_request.current_content,
         )
+        if suggest_request.bypass_cache:
+            set_attributes(cache_bypassed=True)
+            return cache_key, None, _writing_session
+
+        cached_response = suggestion_cache.get(cache_key)
+        set_attributes(cache_hit=cached_response is not None)
+        if cached_response is not None:
+            logger.info("Suggestion cache hit: session_id=%s", suggest_request.session_id)
+        return cache_key, cached_response, _writing_session
+
+    @traced("suggest_service.run_suggestion")
+    async def _run_suggestion(
+        self,
+        cache_key: str,
+        writing_session: WritingSession,
+        suggest_request: SuggestionRequest,
+    ) -> SuggestionResponse:
+        # runs as a shared task that can outlive this request, so it uses its own sessions
+        async with database.async_session_scope() as db:
+            conversation: AgentConversation = await ConversationManager(db=db).get_conversation(
+                session_id=suggest_request.session_id
+            )
+
+        logger.info("Generating suggestion")
+        response: SuggestionResponse = await self._suggest_agent.generate_suggestion(
+            writing_session=writing_session,
+            current_section_id=suggest_request.current_section_id,
+            current_content=suggest_request.current_content,
+            conversation=conversation,
+        )
+        suggestion_cache.set(cache_key, response)
+        await self._save_conversation(conversation)
 
         return response
+
+    async def _fetch_conversation(self, session_id: str) -> AgentConversation:
+        conversation = await self._conversation_manager.get_conversation(session_id=session_id)
+        # end the transaction so no connection is held during the agent run
+        await self._db.commit()
+        return conversation
+
+    async def _save_conversation(self, conversation: AgentConversation) -> None:
+        # own transaction: the streaming path finishes after the request session is gone
+        async with database.async_session_scope() as db:
+            await ConversationManager(db=db).save_conversation(conversation=conversation)
+
+    async def _stream_agent(
+        self,
+        cache_key: str,
+        writing_session: WritingSession,
+        conversation: AgentConversation,
+        suggest_request: SuggestionRequest,
+    ) -> AsyncIterator[SuggestionStreamEvent]:
+        logger.info("Streaming suggestion")
+        with stream_span(
+            "suggest_service.stream_agent",
+            session_id=suggest_request.session_id,
+            section_id=suggest_request.current_section_id,
+        ) as span:
+            events = self._suggest_agent.stream_suggestion(
+                writing_session=writing_session,
+                current_section_id=suggest_request.current_section_id,
+                current_content=suggest_request.current_content,
+                conversation=conversation,
+            )
+            try:
+                async for event in iterate_in_span(span, events):
+                    if event.event == "done" and isinstance(event.data, SuggestionResponse):
+                        suggestion_cache.set(cache_key, event.data)
+                        with trace.use_span(span):
+                            await self._save_conversation(conversation)
+                    yield event
+            except AgentException as e:
+                logger.error("Suggestion stream failed: %s", e.message)
+                set_error(span, e.message)
+                yield SuggestionStreamEvent(event="error", data=e.message)
+            except ValidationError:
+                logger.exception("Suggest agent returned invalid JSON")
+                set_error(span, "Invalid suggestion format")
+                yield SuggestionStreamEvent(event="error", data="Invalid suggestion format")
+            except Exception as e:
+                # headers are already sent, so the client only learns of it from an event
+                logger.exception("Suggestion stream failed")
+                span.record_exception(e)
+                set_error(span, f"{type(e).__name__}: {e}")
+                yield SuggestionStreamEvent(event="error", data="Failed to generate suggestion")
+
+    async def _run_batch(
+        self,
+        batch_request: BatchSuggestionRequest,
+        writing_session: WritingSession,
+    ) -> AsyncIterator[BatchSuggestionEvent]:
+        """Run the section agents concurrently and yield each result as it finishes"""
+        semaphore = asyncio.Semaphore(settings.SUGGEST_BATCH_CONCURRENCY)
+        prefix_cached = asyncio.Event()
+
+        async def _run(index: int, section_id: str) -> SectionSuggestionResult:
+            if index:
+                # every section sends the same system prompt and context block; let the
+                # first run write that prefix to the prompt cache so the rest read it
+                await prefix_cached.wait()
+            async with semaphore:
+                try:
+                    return await self._suggest_section(
+                        writing_session=writing_session,
+                        section_id=section_id,
+                        bypass_cache=batch_request.bypass_cache,
+                        prefix_cached=prefix_cached,
+                    )
+                except AgentException as e:
+                    logger.error("Batch suggestion failed: section_id=%s", section_id)
+                    return SectionSuggestionResult(
+                        section_id=section_id, status="failed", error=e.message
+                    )
+                except ValidationError:
+                    logger.exception("Suggest agent returned invalid JSON")
+                    return SectionSuggestionResult(
+                        section_id=section_id, status="failed", error="Invalid suggestion format"
+                    )
+                except Exception:
+                    # one failed section must not cancel the others
+                    logger.exception("Batch suggestion failed: section_id=%s", section_id)
+                    return SectionSuggestionResult(
+                        section_id=section_id,
+                        status="failed",
+                        error="Failed to generate suggestion",
+                    )
+                finally:
+                    prefix_cached.set()
+
+        section_ids: List[str] = list(dict.fromkeys(batch_request.section_ids))
+        logger.info("Running batch suggestion: sections=%s", len(section_ids))
+        with stream_span(
+            "suggest_service.run_batch",
+            session_id=batch_request.session_id,
+            sections=len(section_ids),
+        ) as span:
+            # section spans become children of the batch
+            with trace.use_span(span):
+                tasks = [
+                    asyncio.create_task(_run(index, section_id))
+                    for index, section_id in enumerate(section_ids)
+                ]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield BatchSuggestionEvent(event="section", data=await finished)
+            finally:
+                for task in tasks:
+                    task.cancel()
+        yield BatchSuggestionEvent(event="done")
+
+    @traced("suggest_service.suggest_section")
+    async def _suggest_section(
+        self,
+        writing_session: WritingSession,
+        section_id: str,
+        bypass_cache: bool,
+        prefix_cached: asyncio.Event,
+    ) -> SectionSuggestionResult:
+        if not self._has_section(writing_session, section_id):
+            return SectionSuggestionResult(
+                section_id=section_id, status="failed", error="Unknown section"
+            )
+
+        set_attributes(section_id=section_id)
+        current_content = writing_session.content.get(section_id, "")
+        cache_key = build_suggestion_key(
+            writing_session=writing_session,
+            current_section_id=section_id,
+            current_content=current_content,
+        )
+        cached_response = None if bypass_cache else suggestion_cache.get(cache_key)
+        set_attributes(cache_hit=cached_response is not None)
+        if cached_response is not None:
+            return SectionSuggestionResult(
+                section_id=section_id, status="succeeded", response=cached_response
+            )
+
+        # stateless: sections must not share or extend the session's conversation,
+        # and the agent collects related links per instance
+        agent = SuggestAgent(client=self._clients.anthropic)
+        events = agent.stream_suggestion(
+            writing_session=writing_session,
+            current_section_id=section_id,
+            current_content=current_content,
+        )
+        async with aclosing(events):
+            async for event in events:
+                prefix_cached.set()
+                if event.event == "done" and isinstance(event.data, SuggestionResponse):
+                    suggestion_cache.set(cache_key, event.data)
+                    return SectionSuggestionResult(
+                        section_id=section_id, status="succeeded", response=event.data
+                    )
+
+        raise AgentException(
+            message="Suggest agent finished without response",
+            endpoint="/assist",
+        )
+
+    def _has_section(self, writing_session: WritingSession, section_id: str) -> bool:
+        return section_id in writing_session.content or any(
+            section.section_id == section_id for section in writing_session.outline
+        )
+
+    async def _replay_suggestion(
+        self, response: SuggestionResponse
+    ) -> AsyncIterator[SuggestionStreamEvent]:
+        if response.related_links:
+            yield SuggestionStreamEvent(event="related_links", data=response.related_links)
+        for suggestion in response.suggestions:
+            yield SuggestionStreamEvent(event="suggestion", data=suggestion)
+        yield SuggestionStreamEvent(event="summary_report", data=response.summary_report)
+        yield SuggestionStreamEvent(event="done", data=response)
@@ -0,0 +1,29 @@
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models.suggestion_batch_model import SuggestionBatchModel
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BatchManager:
+    """オフラインのバッチ提案とsectionの対応を保存・取得する"""
+
+    def __init__(self, db: AsyncSession):
+        self._db: AsyncSession = db
+
+    async def create_batch(
+        self, batch_id: str, session_id: str, section_ids: List[str], backend: str
+    ) -> None:
+        self._db.add(
+            SuggestionBatchModel(
+                batch_id=batch_id,
+                session_id=session_id,
+                section_ids=section_ids,
+                backend=backend,
+            )
+        )
+        logger.info("Saved batch: batch_id=%s, sections=%s", batch_id, len(section_ids))
+
+    async def get_batch(self, batch_id: str) -> SuggestionBatchModel | None:
+        return await self._db.get(SuggestionBatchModel, batch_id)
@@ -0,0 +1,64 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.schemas.assistant_schemas import AgentConversation
+from backend.models.conversation_model import AgentConversationModel
+from backend.core.logger import get_logger
+from backend.core.metrics import DB_CALL_SECONDS, timed
+from backend.core.tracing import set_attributes, traced
+
+logger = get_logger(__name__)
+
+
+class ConversationManager:
+    """SuggestAgentの会話履歴をsession_id単位で保存・取得する"""
+
+    def __init__(self, db: AsyncSession):
+        self._db: AsyncSession = db
+
+    @traced("conversation_manager.get_conversation")
+    @timed(DB_CALL_SECONDS, operation="get_conversation")
+    async def get_conversation(self, session_id: str) -> AgentConversation:
+        """Return stored conversation, or an empty one for a new session"""
+
+        set_attributes(session_id=session_id)
+        fetched_model: AgentConversationModel | None = await self._db.get(
+            AgentConversationModel, session_id
+        )
+        if fetched_model is None:
+            logger.info("No conversation yet: session_id=%s", session_id)
+            return AgentConversation(session_id=session_id)
+
+        logger.info("Got conversation from db: turns=%s", fetched_model.turns)
+        set_attributes(turns=fetched_model.turns)
+        return AgentConversation(
+            session_id=fetched_model.session_id,
+            messages=fetched_model.messages,
+            section_digests=fetched_model.section_digests,
+            context_digest=fetched_model.context_digest,
+            summaries=fetched_model.summaries,
+            turns=fetched_model.turns,
+        )
+
+    @traced("conversation_manager.save_conversation")
+    @timed(DB_CALL_SECONDS, operation="save_conversation")
+    async def save_conversation(self, conversation: AgentConversation) -> None:
+        """Insert or overwrite the conversation of the session (single upsert)"""
+
+        set_attributes(session_id=conversation.session_id, turns=conversation.turns)
+        values = {
+            "session_id": conversation.session_id,
+            "messages": conversation.messages,
+            "section_digests": conversation.section_digests,
+            "context_digest": conversation.context_digest,
+            "summaries": conversation.summaries,
+            "turns": conversation.turns,
+            "updated_at": datetime.now(),
+        }
+        stmt = pg_insert(AgentConversationModel).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AgentConversationModel.session_id],
+            set_={key: value for key, value in values.items() if key != "session_id"},
+        )
+        await self._db.execute(stmt)
+        logger.info("Saved conversation: turns=%s", conversation.turns)
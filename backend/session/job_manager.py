@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+from backend.models.job_model import JobModel
+from backend.schemas.job_schemas import JobResponse
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobManager:
+    """ジョブの状態をDBに保存・取得する"""
+
+    def __init__(self, db: Session):
+        self._db: Session = db
+
+    def create_job(self, kind: str, payload: Dict[str, Any], priority: int) -> JobResponse:
+        created_model: JobModel = JobModel(
+            kind=kind,
+            payload=payload,
+            priority=priority,
+            status="queued",
+            created_at=datetime.now(),
+        )
+        self._db.add(created_model)
+        self._db.flush()
+        logger.info("Created job: job_id=%s, kind=%s", created_model.job_id, kind)
+        return self._to_schema(created_model)
+
+    def get_job(self, job_id: str) -> JobResponse | None:
+        fetched_model: JobModel | None = self._db.get(JobModel, job_id)
+        if fetched_model is None:
+            return None
+        return self._to_schema(fetched_model)
+
+    def claim_job(
+        self, job_id: str, owner: str, lease_seconds: int
+    ) -> Tuple[str, Dict[str, Any]] | None:
+        """Mark a queued job as running by owner and return (kind, payload), None if taken"""
+
+        now = datetime.now()
+        stmt = (
+            update(JobModel)
+            .where(JobModel.job_id == job_id, JobModel.status == "queued")
+            .values(
+                status="running",
+                started_at=now,
+                owner=owner,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(JobModel.kind, JobModel.payload)
+        )
+        row = self._db.execute(stmt).one_or_none()
+        if row is None:
+            return None
+        return row.kind, row.payload
+
+    def finish_job(
+        self,
+        job_id: str,
+        owner: str,
+        result: Dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> bool:
+        """Store the outcome, False when the lease was lost and another owner took the job"""
+
+        stmt = (
+            update(JobModel)
+            .where(
+                JobModel.job_id == job_id,
+                JobModel.status == "running",
+                JobModel.owner == owner,
+            )
+            .values(
+                status="failed" if error is not None else "succeeded",
+                result=result,
+                error=error,
+                finished_at=datetime.now(),
+                lease_expires_at=None,
+            )
+        )
+        return self._db.execute(stmt).rowcount == 1
+
+    def renew_leases(self, owner: str, lease_seconds: int) -> int:
+        """Extend the lease of every job owner is running"""
+
+        stmt = (
+            update(JobModel)
+            .where(JobModel.status == "running", JobModel.owner == owner)
+            .values(lease_expires_at=datetime.now() + timedelta(seconds=lease_seconds))
+        )
+        return self._db.execute(stmt).rowcount
+
+    def reclaim_expired(self) -> List[Tuple[str, int]]:
+        """
+        Put running jobs whose lease expired, i.e. whose process stopped without
+        finishing them, back in the queue and return their (job_id, priority)
+        """
+
+        stmt = (
+            update(JobModel)
+            .where(
+                JobModel.status == "running",
+                or_(
+                    JobModel.lease_expires_at.is_(None),
+                    JobModel.lease_expires_at < datetime.now(),
+                ),
+            )
+            .values(status="queued", started_at=None, owner=None, lease_expires_at=None)
+            .returning(JobModel.job_id, JobModel.priority)
+        )
+        return [(row.job_id, row.priority) for row in self._db.execute(stmt)]
+
+    def queued_jobs(self) -> List[Tuple[str, int]]:
+        """(job_id, priority) of every queued job, oldest first"""
+
+        stmt = (
+            select(JobModel.job_id, JobModel.priority)
+            .where(JobModel.status == "queued")
+            .order_by(JobModel.created_at)
+        )
+        return [(row.job_id, row.priority) for row in self._db.execute(stmt)]
+
+    def _to_schema(self, model: JobModel) -> JobResponse:
+        return JobResponse(
+            job_id=model.job_id,
+            kind=model.kind,
+            status=model.status,
+            priority=model.priority,
+            result=model.result,
+            error=model.error,
+            created_at=model.created_at,
+            started_at=model.started_at,
+            finished_at=model.finished_at,
+        )
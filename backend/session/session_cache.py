@@ -0,0 +1,260 @@
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy import ColumnElement, event, func
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+from backend.schemas.assistant_schemas import WritingSession
+
+logger = get_logger(__name__)
+
+_PENDING_KEY = "session_cache_pending"
+
+
+class SessionCache(ABC):
+    """
+    Read-through cache of validated WritingSession objects.
+
+    Writes are staged on the SQLAlchemy session and applied only after it
+    commits, so a rolled back write never reaches the cache. A read fills the
+    cache only if no write was applied while it ran (see generation()).
+    """
+
+    @abstractmethod
+    def get(self, session_id: str) -> WritingSession | None:
+        """The cached session; it is shared, so callers must not mutate it (use model_copy)"""
+
+    @abstractmethod
+    def peek(self, session_id: str) -> WritingSession | None:
+        """Like get, without counting a hit or miss or touching the LRU order"""
+
+    @abstractmethod
+    def generation(self) -> int:
+        """Counter of applied writes, taken before a database read and passed to fill()"""
+
+    @abstractmethod
+    def fill(self, writing_session: WritingSession, generation: int) -> None:
+        """Cache a session read from the database, unless a write was applied since"""
+
+    @abstractmethod
+    def remember(self, writing_session: WritingSession) -> None:
+        """Cache the session as just written"""
+
+    @abstractmethod
+    def forget(self, session_id: str) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]: ...
+
+    async def stage_write(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        apply: Callable[[], None],
+    ) -> None:
+        """Run apply once db commits"""
+        pending: List[Callable[[], None]] = db.sync_session.info.setdefault(_PENDING_KEY, [])
+        pending.append(apply)
+
+    def notify_columns(self, session_id: str) -> List[ColumnElement[Any]]:
+        """
+        Expressions to add to the RETURNING of a write of session_id, so backends
+        shared between workers tell their peers in the same statement
+        """
+        return []
+
+    async def start(self) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(sync_session: Session) -> None:
+    for apply in sync_session.info.pop(_PENDING_KEY, []):
+        apply()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(sync_session: Session) -> None:
+    sync_session.info.pop(_PENDING_KEY, None)
+
+
+class NullSessionCache(SessionCache):
+    """Cache turned off: every read goes to the database"""
+
+    def get(self, session_id: str) -> WritingSession | None:
+        return None
+
+    def peek(self, session_id: str) -> WritingSession | None:
+        return None
+
+    def generation(self) -> int:
+        return 0
+
+    def fill(self, writing_session: WritingSession, generation: int) -> None:
+        return None
+
+    def remember(self, writing_session: WritingSession) -> None:
+        return None
+
+    def forget(self, session_id: str) -> None:
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "size": 0, "maxsize": 0, "bytes": 0}
+
+    async def stage_write(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        apply: Callable[[], None],
+    ) -> None:
+        return None
+
+
+class InMemorySessionCache(SessionCache):
+    """Per-process LRU bounded by entry count and by serialized size"""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self._max_entries: int = max_entries
+        self._max_bytes: int = max_bytes
+        self._data: OrderedDict[str, Tuple[int, WritingSession]] = OrderedDict()
+        self._bytes: int = 0
+        # bumped by every write or invalidation; one counter for all sessions keeps it
+        # bounded, at the cost of skipping fills that overlap writes to other sessions
+        self._generation: int = 0
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, session_id: str) -> WritingSession | None:
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(session_id)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, session_id: str) -> WritingSession | None:
+        with self._lock:
+            entry = self._data.get(session_id)
+            return entry[1] if entry is not None else None
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def fill(self, writing_session: WritingSession, generation: int) -> None:
+        self._store(writing_session, generation=generation)
+
+    def remember(self, writing_session: WritingSession) -> None:
+        self._store(writing_session, generation=None)
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._pop(session_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self._max_entries,
+            "bytes": self._bytes,
+        }
+
+    def _store(self, writing_session: WritingSession, generation: int | None) -> None:
+        """Cache a write (generation None) or a read that started at generation"""
+
+        size = len(writing_session.model_dump_json())
+        with self._lock:
+            if generation is None:
+                self._generation += 1
+            elif generation != self._generation:
+                # a write committed while this read ran; its copy may be older
+                return
+            self._pop(writing_session.session_id)
+            if size > self._max_bytes:
+                return
+            self._data[writing_session.session_id] = (size, writing_session)
+            self._bytes += size
+            while len(self._data) > self._max_entries or self._bytes > self._max_bytes:
+                _, (evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def _pop(self, session_id: str) -> None:
+        entry = self._data.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+
+
+class PostgresNotifySessionCache(InMemorySessionCache):
+    """
+    In-memory cache whose workers invalidate each other with LISTEN/NOTIFY.
+
+    The NOTIFY is part of the write statement itself (see notify_columns), so
+    it costs no extra round trip, and peers only drop their copy once the new
+    row is committed and a reread cannot see the old one.
+    """
+
+    CHANNEL = "writing_session_cache"
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+        self._worker_id: str = uuid.uuid4().hex
+        self._connection: AsyncConnection | None = None
+        self._driver_connection: Any = None
+
+    def notify_columns(self, session_id: str) -> List[ColumnElement[Any]]:
+        return [
+            func.pg_notify(self.CHANNEL, f"{self._worker_id}:{session_id}").label("cache_notify")
+        ]
+
+    async def start(self) -> None:
+        from backend.core.database import database
+
+        self._connection = await database.async_engine.connect()
+        raw_connection = await self._connection.get_raw_connection()
+        self._driver_connection = raw_connection.driver_connection
+        await self._driver_connection.add_listener(self.CHANNEL, self._on_notify)
+        logger.info("Listening for session cache invalidation: worker=%s", self._worker_id)
+
+    async def stop(self) -> None:
+        if self._driver_connection is not None:
+            await self._driver_connection.remove_listener(self.CHANNEL, self._on_notify)
+        if self._connection is not None:
+            await self._connection.close()
+        self._connection = None
+        self._driver_connection = None
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        worker_id, _, session_id = payload.partition(":")
+        if worker_id != self._worker_id:
+            logger.debug("Session cache invalidated by peer: session_id=%s", session_id)
+            self.forget(session_id)
+
+
+def build_session_cache() -> SessionCache:
+    if settings.SESSION_CACHE_BACKEND == "none":
+        return NullSessionCache()
+    if settings.SESSION_CACHE_BACKEND == "postgres":
+        return PostgresNotifySessionCache(
+            max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+            max_bytes=settings.SESSION_CACHE_MAX_BYTES,
+        )
+    return InMemorySessionCache(
+        max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+        max_bytes=settings.SESSION_CACHE_MAX_BYTES,
+    )
+
+
+session_cache: SessionCache = build_session_cache()
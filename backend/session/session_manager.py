@@ -1,31 +1,50 @@
 import uuid
 from datetime import datetime
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+from sqlalchemy import CTE, Text, and_, case, cast, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
 from backend.schemas.assistant_schemas import (
     WritingSession,
+    OutlineSection,
     CreateSessionResponse,
+    SectionPatchRequest,
+    UpdatedSectionResponse,
 )
 from backend.exceptions.exceptions import SessionException
-from backend.models.session_model import WritingSessionModel
+from backend.models.session_model import WritingSessionModel, WritingSectionModel
+from backend.session.session_cache import session_cache
 from backend.core.logger import get_logger
+from backend.core.metrics import DB_CALL_SECONDS, timed
+from backend.core.tracing import set_attributes, traced
 
 logger = get_logger(__name__)
 
+_OUTLINE_FIELDS = ("title", "level", "order")
+_SECTION_FIELDS = (*_OUTLINE_FIELDS, "content")
+_SECTION_WRITE_FIELDS = (*_SECTION_FIELDS, "updated_at")
+
 
 class SessionManager:
-    def __init__(self, db: Session):
-        self._db: Session = db
+    def __init__(self, db: AsyncSession):
+        self._db: AsyncSession = db
 
-    def create_session(self, topic: str) -> CreateSessionResponse:
+    @traced("session_manager.create_session")
+    @timed(DB_CALL_SECONDS, operation="create_session")
+    async def create_session(self, topic: str) -> CreateSessionResponse:
         """Create session and return session_id"""
 
         _session_id = str(uuid.uuid4())  # review: session id should created by pre layer.
-        if not self.check_db_by_session_id(_session_id):
+        set_attributes(session_id=_session_id)
+        if not await self.check_db_by_session_id(_session_id):
             created_model: WritingSessionModel = WritingSessionModel(
                 session_id=_session_id,
                 topic=topic,
             )
 
+            # a new id cannot be cached yet, so there is nothing to stage
             self._db.add(created_model)
 
             session_response: CreateSessionResponse = CreateSessionResponse(
@@ -41,22 +60,42 @@ class SessionManager:
             endpoint="/assist",
         )
 
-    def get_session(self, session_id: str) -> WritingSession:
-        """Return WritingSession by session_id"""
+    @traced("session_manager.get_session")
+    @timed(DB_CALL_SECONDS, operation="get_session")
+    async def get_session(self, session_id: str) -> WritingSession:
+        """
+        Return WritingSession by session_id, from the cache or reassembled from its sections.
+        The cached object is shared: do not mutate it, use model_copy.
+        """
 
-        fetched_model: WritingSessionModel = self.check_db_by_session_id(session_id=session_id)
-        if fetched_model:
-            # review: is there a more simple code... (dump into session obj)
-            fetched_session: WritingSession = WritingSession(
-                session_id=fetched_model.session_id,
-                topic=fetched_model.topic,
-                target_audience=fetched_model.target_audience,
-                outline=fetched_model.outline,
-                content=fetched_model.content,
-                created_at=fetched_model.created_at,
-                updated_at=fetched_model.updated_at,
+        if not session_id:
+            raise SessionException(
+                message="Rquire session_id",
+                endpoint="/assist",
             )
 
+        cached_session = session_cache.get(session_id)
+        set_attributes(session_id=session_id, cache_hit=cached_session is not None)
+        if cached_session is not None:
+            logger.info("Got session from cache")
+            return cached_session
+
+        generation = session_cache.generation()
+        stmt = (
+            select(WritingSessionModel, WritingSectionModel)
+            .outerjoin(
+                WritingSectionModel,
+                WritingSectionModel.session_id == WritingSessionModel.session_id,
+            )
+            .where(WritingSessionModel.session_id == session_id)
+        )
+        rows = (await self._db.execute(stmt)).all()
+        if rows:
+            fetched_model: WritingSessionModel = rows[0][0]
+            sections: List[WritingSectionModel] = [row[1] for row in rows if row[1] is not None]
+            fetched_session: WritingSession = self._to_schema(fetched_model, sections)
+            session_cache.fill(fetched_session, generation)
+
             logger.info("Got session from db")
             return fetched_session
 
@@ -64,37 +103,198 @@ class SessionManager:
             raise SessionException(
                 message=f"Session {session_id} not found",
                 endpoint="/assist",
+                status_code=404,
             )
 
-    def update_session(self, writing_session: WritingSession) -> CreateSessionResponse:
-        """Create session and return session_id"""
+    @traced("session_manager.update_session")
+    async def update_session(self, writing_session: WritingSession) -> CreateSessionResponse:
+        """Update session and its sections, raise SessionException (404) if it does not exist"""
+
+        await self.save_session(writing_session=writing_session)
+        logger.info("Updated session form db")
+        return CreateSessionResponse(status="success", session_id=writing_session.session_id)
+
+    @traced("session_manager.save_session")
+    @timed(DB_CALL_SECONDS, operation="save_session")
+    async def save_session(self, writing_session: WritingSession) -> WritingSession:
+        """
+        Update an existing session and its sections in one UPDATE ... RETURNING
+        statement and return the stored session. Sessions are only created by
+        create_session: an unknown session_id raises SessionException (404).
+        """
 
         _session_id = writing_session.session_id
-        writing_session_json = writing_session.model_dump()
+        set_attributes(session_id=_session_id, sections=len(writing_session.outline))
+        now = datetime.now()
 
-        fetched_model: WritingSessionModel = self.check_db_by_session_id(session_id=_session_id)
-        if fetched_model:
-            fetched_model.topic = writing_session_json["topic"]
-            fetched_model.target_audience = writing_session_json["target_audience"]
-            fetched_model.outline = writing_session_json["outline"]
-            fetched_model.content = writing_session_json["content"]
-            fetched_model.updated_at = datetime.now()
+        stmt = (
+            update(WritingSessionModel)
+            .where(WritingSessionModel.session_id == _session_id)
+            .values(
+                topic=writing_session.topic,
+                target_audience=writing_session.target_audience,
+                outline=[],
+                content={},
+                updated_at=now,
+            )
+            .returning(WritingSessionModel.created_at, *session_cache.notify_columns(_session_id))
+            .add_cte(*self._section_write_ctes(writing_session, now))
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            created_at: datetime | None = (await self._db.execute(stmt)).scalar_one_or_none()
+        except IntegrityError:
+            # the section insert hits the foreign key when the session does not exist
+            created_at = None
 
-            session_response: CreateSessionResponse = CreateSessionResponse(
-                status="success",
-                session_id=_session_id,
+        if created_at is None:
+            raise SessionException(
+                message=f"Session {_session_id} not found",
+                endpoint="/assist",
+                status_code=404,
             )
 
-            logger.info("Updated session form db")
-            return session_response
+        # sections now match the request body, so no need to read them back
+        saved_session = writing_session.model_copy(
+            update={"created_at": created_at, "updated_at": now}
+        )
+        await session_cache.stage_write(
+            self._db, _session_id, lambda: session_cache.remember(saved_session)
+        )
+        return saved_session
 
-        raise SessionException(
-            message="Session not found",
-            endpoint="/assist",
+    @traced("session_manager.patch_section")
+    @timed(DB_CALL_SECONDS, operation="patch_section")
+    async def patch_section(
+        self, session_id: str, section_id: str, section_patch: SectionPatchRequest
+    ) -> UpdatedSectionResponse:
+        """Insert or update a single section without touching the rest of the session"""
+
+        set_attributes(session_id=session_id, section_id=section_id)
+        values = section_patch.model_dump(exclude_unset=True)
+        if any(field in values for field in _OUTLINE_FIELDS):
+            await self._check_outline_patch(session_id, section_id, values)
+        now = datetime.now()
+
+        touch_session = (
+            update(WritingSessionModel)
+            .where(WritingSessionModel.session_id == session_id)
+            .values(updated_at=now)
+            .cte("touch_session")
+        )
+        insert_stmt = pg_insert(WritingSectionModel).values(
+            session_id=session_id,
+            section_id=section_id,
+            updated_at=now,
+            **values,
+        )
+        stmt = (
+            insert_stmt.on_conflict_do_update(
+                index_elements=[WritingSectionModel.session_id, WritingSectionModel.section_id],
+                set_={key: insert_stmt.excluded[key] for key in [*values, "updated_at"]},
+            )
+            .returning(WritingSectionModel.section_id, *session_cache.notify_columns(session_id))
+            .add_cte(touch_session)
+        )
+        try:
+            await self._db.execute(stmt)
+        except IntegrityError:
+            raise SessionException(
+                message=f"Session {session_id} not found",
+                endpoint="/assist",
+                status_code=404,
+            )
+
+        await session_cache.stage_write(
+            self._db,
+            session_id,
+            lambda: self._patch_cached_section(session_id, section_id, values, now),
         )
 
+        logger.info("Patched section: session_id=%s, section_id=%s", session_id, section_id)
+        return UpdatedSectionResponse(
+            status="success",
+            session_id=session_id,
+            section_id=section_id,
+        )
+
+    async def migrate_legacy_sessions(self) -> int:
+        """
+        Copy sessions still stored in the legacy JSON columns into writing_section.
+
+        A section row written by PATCH before the copy keeps its own values; only
+        the fields it left NULL are filled from the JSON columns. Returns the
+        number of sessions copied.
+        """
+
+        # json_array_length raises on null or any other non-array value
+        outline_length = case(
+            (
+                func.json_typeof(WritingSessionModel.outline) == "array",
+                func.json_array_length(WritingSessionModel.outline),
+            ),
+            else_=0,
+        )
+        stmt = select(WritingSessionModel).where(
+            or_(
+                outline_length > 0,
+                and_(
+                    func.json_typeof(WritingSessionModel.content) == "object",
+                    cast(WritingSessionModel.content, Text) != "{}",
+                ),
+            )
+        )
+        legacy_models = (await self._db.execute(stmt)).scalars().all()
+        for legacy_model in legacy_models:
+            legacy_outline = legacy_model.outline if isinstance(legacy_model.outline, list) else []
+            legacy_content = legacy_model.content if isinstance(legacy_model.content, dict) else {}
+            outline: List[OutlineSection] = []
+            for item in legacy_outline:
+                try:
+                    outline.append(OutlineSection.model_validate(item))
+                except ValidationError:
+                    logger.warning(
+                        "Skipping invalid legacy outline entry: session_id=%s",
+                        legacy_model.session_id,
+                    )
+            content = {
+                section_id: text
+                for section_id, text in legacy_content.items()
+                if isinstance(text, str)
+            }
+            rows = self._section_rows(legacy_model.session_id, outline, content, datetime.now())
+            if rows:
+                section_insert = pg_insert(WritingSectionModel).values(list(rows.values()))
+                table = WritingSectionModel.__table__
+                await self._db.execute(
+                    section_insert.on_conflict_do_update(
+                        index_elements=[
+                            WritingSectionModel.session_id,
+                            WritingSectionModel.section_id,
+                        ],
+                        set_={
+                            field: func.coalesce(table.c[field], section_insert.excluded[field])
+                            for field in _SECTION_FIELDS
+                        },
+                    )
+                )
+            await self._db.execute(
+                update(WritingSessionModel)
+                .where(WritingSessionModel.session_id == legacy_model.session_id)
+                .values(outline=[], content={})
+                .execution_options(synchronize_session=False)
+            )
+            session_cache.forget(legacy_model.session_id)
+
+        if legacy_models:
+            logger.info("Migrated legacy sessions: count=%s", len(legacy_models))
+        return len(legacy_models)
+
     # todo move to session service
-    def check_db_by_session_id(self, session_id: str) -> WritingSessionModel | None:
+    @traced("session_manager.check_db_by_session_id")
+    @timed(DB_CALL_SECONDS, operation="check_db_by_session_id")
+    async def check_db_by_session_id(self, session_id: str) -> WritingSessionModel | None:
+        set_attributes(session_id=session_id)
         if not session_id:
             logger.error("No section id")
             raise SessionException(
@@ -102,10 +302,162 @@ class SessionManager:
                 endpoint="/assist",
             )
         else:
-            result = self._db.get(WritingSessionModel, session_id)
+            result = await self._db.get(WritingSessionModel, session_id)
             if result:
                 logger.info("Registerd session found")
                 return result
             else:
                 logger.info("This session_id is not used")
                 return None
+
+    async def _check_outline_patch(
+        self, session_id: str, section_id: str, values: Dict[str, Any]
+    ) -> None:
+        """Reject a patch that would leave a section with a title but no level or order"""
+
+        existing: WritingSectionModel | None = await self._db.get(
+            WritingSectionModel, (session_id, section_id)
+        )
+        merged = {
+            field: values[field] if field in values else getattr(existing, field, None)
+            for field in _OUTLINE_FIELDS
+        }
+        if merged["title"] is not None and (merged["level"] is None or merged["order"] is None):
+            raise SessionException(
+                message="A section with a title needs level and order",
+                endpoint="/assist",
+                status_code=422,
+            )
+
+    def _patch_cached_section(
+        self, session_id: str, section_id: str, values: Dict[str, Any], now: datetime
+    ) -> None:
+        """Apply a content-only patch to the cached session, drop it for outline changes"""
+
+        cached_session = session_cache.peek(session_id)
+        if cached_session is None:
+            return
+        if any(field in values for field in ("title", "level", "order")):
+            # the cached outline may not know the other fields of this row
+            session_cache.forget(session_id)
+            return
+
+        content = dict(cached_session.content)
+        if "content" in values:
+            if values["content"] is None:
+                content.pop(section_id, None)
+            else:
+                content[section_id] = values["content"]
+        session_cache.remember(
+            cached_session.model_copy(update={"content": content, "updated_at": now})
+        )
+
+    def _section_write_ctes(self, writing_session: WritingSession, now: datetime) -> List[CTE]:
+        """
+        CTEs that make writing_section match the session: upsert every section and
+        delete sections that are gone. Rows whose fields did not change are skipped
+        by the ON CONFLICT ... WHERE, so they produce no new row version.
+        """
+
+        rows = self._section_rows(
+            writing_session.session_id, writing_session.outline, writing_session.content, now
+        )
+
+        ctes: List[CTE] = []
+        if rows:
+            section_insert = pg_insert(WritingSectionModel).values(list(rows.values()))
+            ctes.append(
+                section_insert.on_conflict_do_update(
+                    index_elements=[WritingSectionModel.session_id, WritingSectionModel.section_id],
+                    set_={field: section_insert.excluded[field] for field in _SECTION_WRITE_FIELDS},
+                    where=or_(
+                        *(
+                            WritingSectionModel.__table__.c[field].is_distinct_from(
+                                section_insert.excluded[field]
+                            )
+                            for field in _SECTION_FIELDS
+                        )
+                    ),
+                ).cte("upsert_sections")
+            )
+        ctes.append(
+            delete(WritingSectionModel)
+            .where(
+                WritingSectionModel.session_id == writing_session.session_id,
+                WritingSectionModel.section_id.not_in(list(rows)),
+            )
+            .cte("delete_stale_sections")
+        )
+        return ctes
+
+    def _section_rows(
+        self,
+        session_id: str,
+        outline: List[OutlineSection],
+        content: Dict[str, str],
+        now: datetime,
+    ) -> Dict[str, Dict[str, Any]]:
+        """writing_section rows by section_id for an outline and its content"""
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for section in outline:
+            rows[section.section_id] = {
+                "session_id": session_id,
+                "section_id": section.section_id,
+                "title": section.title,
+                "level": section.level,
+                "order": section.order,
+                "content": None,
+                "updated_at": now,
+            }
+        for section_id, text in content.items():
+            row = rows.setdefault(
+                section_id,
+                {
+                    "session_id": session_id,
+                    "section_id": section_id,
+                    "title": None,
+                    "level": None,
+                    "order": None,
+                    "updated_at": now,
+                },
+            )
+            row["content"] = text
+        return rows
+
+    def _to_schema(
+        self,
+        fetched_model: WritingSessionModel,
+        sections: List[WritingSectionModel],
+    ) -> WritingSession:
+        if sections:
+            outline = [
+                OutlineSection(
+                    section_id=section.section_id,
+                    title=section.title,
+                    level=section.level,
+                    order=section.order,
+                )
+                for section in sorted(sections, key=lambda section: section.order or 0)
+                # content-only rows, and rows left incomplete before PATCH checked them
+                if all(getattr(section, field) is not None for field in _OUTLINE_FIELDS)
+            ]
+            content = {
+                section.section_id: section.content
+                for section in sections
+                if section.content is not None
+            }
+        else:
+            # sessions written before per-section storage and not yet migrated
+            outline = fetched_model.outline or []
+            content = fetched_model.content or {}
+
+        return WritingSession(
+            session_id=fetched_model.session_id,
+            topic=fetched_model.topic,
+            target_audience=fetched_model.target_audience,
+            outline=outline,
+            content=content,
+            created_at=fetched_model.created_at,
+            updated_at=fetched_model.updated_at,
+        )
@@ -0,0 +1,291 @@
+"""
+Offline micro-benchmarks for the pure-Python hot paths.
+
+Synthetic sessions and article directories are built for each size (10 to
+10k sections or articles); nothing calls an LLM, the database or the network.
+
+    python -m backend.test.benchmark --output bench.json
+    python -m backend.test.benchmark --compare bench.json --threshold 0.2
+
+With --compare, every case whose median got slower than the baseline by more
+than the threshold is reported as a regression and the exit code is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# settings refuses to load without keys; benchmarks never use them
+for _name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(_name, "sk-benchmark")
+for _name in ("OPENAI_API_KEY_FILE", "ANTHROPIC_API_KEY_FILE", "GITHUB_USER"):
+    os.environ.setdefault(_name, "benchmark")
+for _name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(_name, "benchmark")
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+SECTION_TEXT = "SQLAlchemyのセッションとトランザクションの関係を整理します。" * 4
+
+# (case name, size, setup) -- setup builds the fixture and returns the function to time
+Case = Tuple[str, int | None, Callable[[ExitStack], Callable[[], Any]]]
+
+
+def _make_session(size: int):
+    from backend.schemas.assistant_schemas import OutlineSection, WritingSession
+
+    now = datetime(2025, 1, 1)
+    return WritingSession(
+        session_id="benchmark",
+        topic="SQLAlchemy入門",
+        target_audience="beginner",
+        outline=[
+            OutlineSection(section_id=str(i), title=f"Section {i}", level=2, order=i)
+            for i in range(size)
+        ],
+        content={str(i): f"{SECTION_TEXT} ({i})" for i in range(size)},
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _make_articles(stack: ExitStack, size: int) -> Tuple[Path, List[str]]:
+    from backend.zenn.scaffold_service import ScaffoldService
+
+    articles_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-")))
+    scaffold = ScaffoldService()
+    slugs = [f"{i:014x}" for i in range(size)]
+    for i, slug in enumerate(slugs):
+        text = scaffold.render(
+            title=f"Article {i}", emoji="🐍", type="tech", content=SECTION_TEXT, published=False
+        )
+        (articles_dir / f"{slug}.md").write_text(text, encoding="utf-8")
+    return articles_dir, slugs
+
+
+def _build_prompt(size: int) -> Callable[[ExitStack], Callable[[], Any]]:
+    def setup(stack: ExitStack) -> Callable[[], Any]:
+        from anthropic import AsyncAnthropic
+        from backend.agents.suggestion_agent import SuggestAgent
+
+        agent = SuggestAgent(client=AsyncAnthropic(api_key="sk-benchmark"))
+        session = _make_session(size)
+        return lambda: agent._build_prompt(session, "0", SECTION_TEXT)
+
+    return setup
+
+
+def _suggestion_key(size: int) -> Callable[[ExitStack], Callable[[], Any]]:
+    def setup(stack: ExitStack) -> Callable[[], Any]:
+        from backend.services.suggest_service import build_suggestion_key
+
+        session = _make_session(size)
+        return lambda: build_suggestion_key(session, "0", SECTION_TEXT)
+
+    return setup
+
+
+def _session_to_schema(size: int) -> Callable[[ExitStack], Callable[[], Any]]:
+    def setup(stack: ExitStack) -> Callable[[], Any]:
+        from backend.models.session_model import WritingSectionModel, WritingSessionModel
+        from backend.session.session_manager import SessionManager
+
+        now = datetime(2025, 1, 1)
+        session_model = WritingSessionModel(
+            session_id="benchmark",
+            topic="SQLAlchemy入門",
+            target_audience="beginner",
+            created_at=now,
+            updated_at=now,
+        )
+        sections = [
+            WritingSectionModel(
+                session_id="benchmark",
+                section_id=str(i),
+                title=f"Section {i}",
+                level=2,
+                order=i,
+                content=f"{SECTION_TEXT} ({i})",
+            )
+            for i in range(size)
+        ]
+        manager = SessionManager(db=None)  # type: ignore[arg-type]
+        return lambda: manager._to_schema(session_model, sections)
+
+    return setup
+
+
+def _index_build(size: int) -> Callable[[ExitStack], Callable[[], Any]]:
+    def setup(stack: ExitStack) -> Callable[[], Any]:
+        from backend.zenn.article_index import ArticleIndex
+
+        articles_dir, _ = _make_articles(stack, size)
+        # a new index every time: the cost of a cold start over the directory
+        return lambda: ArticleIndex(articles_dir=articles_dir).build()
+
+    return setup
+
+
+def _get_article_path(size: int) -> Callable[[ExitStack], Callable[[], Any]]:
+    def setup(stack: ExitStack) -> Callable[[], Any]:
+        import backend.zenn.file_service as file_service_module
+        from backend.zenn.article_index import ArticleIndex
+
+        articles_dir, slugs = _make_articles(stack, size)
+        index = ArticleIndex(articles_dir=articles_dir)
+        index.build()
+        original_index = file_service_module.article_index
+        file_service_module.article_index = index
+        stack.callback(setattr, file_service_module, "article_index", original_index)
+
+        file_service = file_service_module.FileService()
+        lookups: Iterator[str] = _cycle(slugs)
+        return lambda: file_service.get_article_path(article_slug=next(lookups))
+
+    return setup
+
+
+def _frontmatter_read(stack: ExitStack) -> Callable[[], Any]:
+    from backend.zenn.frontmatter import read_frontmatter
+
+    articles_dir, slugs = _make_articles(stack, 1)
+    article_path = articles_dir / f"{slugs[0]}.md"
+    with article_path.open("a", encoding="utf-8") as f:
+        f.write(SECTION_TEXT * 1000)  # the body must not be read
+    return lambda: read_frontmatter(article_path)
+
+
+def _frontmatter_edit(stack: ExitStack) -> Callable[[], Any]:
+    from backend.zenn.frontmatter import edit_frontmatter
+
+    articles_dir, slugs = _make_articles(stack, 1)
+    article_path = articles_dir / f"{slugs[0]}.md"
+
+    def _toggle(fields: Dict[str, Any]) -> Dict[str, Any]:
+        # flip the flag so every call rewrites the file (publish / unpublish)
+        return {"published": not fields["published"], "topics": ["python", "benchmark"]}
+
+    return lambda: edit_frontmatter(article_path, _toggle)
+
+
+def _cycle(items: List[str]) -> Iterator[str]:
+    while True:
+        yield from items
+
+
+def build_cases(sizes: List[int]) -> List[Case]:
+    cases: List[Case] = []
+    for size in sizes:
+        cases += [
+            ("suggest_agent.build_prompt", size, _build_prompt(size)),
+            ("suggest_service.suggestion_key", size, _suggestion_key(size)),
+            ("session_manager.to_schema", size, _session_to_schema(size)),
+            ("article_index.build", size, _index_build(size)),
+            ("file_service.get_article_path", size, _get_article_path(size)),
+        ]
+    cases += [
+        ("frontmatter.read", None, _frontmatter_read),
+        ("frontmatter.edit", None, _frontmatter_edit),
+    ]
+    return cases
+
+
+def case_id(name: str, size: int | None) -> str:
+    return name if size is None else f"{name}[{size}]"
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Seconds per call: timeit loops sized to ~0.2s, repeated, min and median kept"""
+
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    per_call = [total / loops for total in timer.repeat(repeat=repeat, number=loops)]
+    return {"loops": loops, "min": min(per_call), "median": statistics.median(per_call)}
+
+
+def run(sizes: List[int], repeat: int, only: str | None) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, size, setup in build_cases(sizes):
+        key = case_id(name, size)
+        if only and only not in key:
+            continue
+        with ExitStack() as stack:
+            results[key] = measure(setup(stack), repeat=repeat)
+        print(f"{key:<45} {_format_seconds(results[key]['median']):>10}", flush=True)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Print the change against baseline per case and return the regressed cases"""
+
+    regressions: List[str] = []
+    print(f"\n{'case':<45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["median"], result["median"]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:<45} {_format_seconds(before):>10} {_format_seconds(after):>10}"
+            f" {change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="JSON of an earlier run to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%% (default)"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(sizes=args.sizes, repeat=args.repeat, only=args.only)
+
+    if args.output:
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, threshold=args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
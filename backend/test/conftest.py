@@ -0,0 +1,9 @@
+import os
+
+# settings refuses to load without keys; tests never use them
+for _name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY"):
+    os.environ.setdefault(_name, "sk-test")
+for _name in ("OPENAI_API_KEY_FILE", "ANTHROPIC_API_KEY_FILE", "GITHUB_USER"):
+    os.environ.setdefault(_name, "test")
+for _name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(_name, "test")
@@ -0,0 +1,27 @@
+from backend.zenn.article_index import ArticleIndex
+
+
+def test_undecodable_article_does_not_break_the_index(tmp_path):
+    (tmp_path / "good.md").write_text('---\ntitle: "Good"\npublished: false\n---\nbody\n')
+    (tmp_path / "bad.md").write_bytes(b"---\ntitle: \xff\xfe\n---\n")
+    index = ArticleIndex(articles_dir=tmp_path)
+
+    index.build()
+
+    assert index.get_path("good") == tmp_path / "good.md"
+    # still found, so publishing it reports its own error
+    assert index.get_path("bad") == tmp_path / "bad.md"
+    assert {info.slug: info.title for info in index.list_articles()} == {"good": "Good", "bad": ""}
+
+
+def test_article_becoming_undecodable_keeps_other_lookups_working(tmp_path):
+    (tmp_path / "good.md").write_text('---\ntitle: "Good"\n---\n')
+    index = ArticleIndex(articles_dir=tmp_path)
+    index.build()
+
+    (tmp_path / "bad.md").write_bytes(b"---\ntitle: \xff\n---\n")
+
+    assert index.get_paths(["good", "bad"]) == {
+        "good": tmp_path / "good.md",
+        "bad": tmp_path / "bad.md",
+    }
@@ -0,0 +1,97 @@
+import pytest
+from backend.zenn.frontmatter import (
+    _render_header,
+    _strip_comment,
+    edit_frontmatter,
+    read_frontmatter,
+    update_frontmatter,
+)
+
+ARTICLE = (
+    "---\n"
+    'title: "Old" # shown in the feed\n'
+    'emoji: "📝"\n'
+    'topics: ["python", "fastapi"]\n'
+    "published: false # flip when ready\n"
+    "---\n"
+    "body line\n"
+    "--- not a delimiter inside the body\n"
+)
+
+
+def test_rewrite_keeps_trailing_comments_and_body(tmp_path):
+    path = tmp_path / "article.md"
+    path.write_text(ARTICLE)
+
+    fields = update_frontmatter(path, {"published": True, "title": 'New "one"'})
+
+    assert fields["published"] is True
+    assert path.read_text() == ARTICLE.replace(
+        'title: "Old" # shown in the feed', 'title: "New \\"one\\"" # shown in the feed'
+    ).replace("published: false # flip", "published: true # flip")
+    assert read_frontmatter(path) == fields
+
+
+def test_edit_sees_current_fields_and_appends_new_keys(tmp_path):
+    path = tmp_path / "article.md"
+    path.write_text(ARTICLE)
+
+    fields = edit_frontmatter(
+        path, lambda current: {"topics": [*current["topics"], "zenn"], "type": "tech"}
+    )
+
+    assert fields["topics"] == ["python", "fastapi", "zenn"]
+    header = path.read_text().split("---\n")[1]
+    assert header.endswith('type: "tech"\n')
+    assert 'topics: ["python", "fastapi", "zenn"]\n' in header
+
+
+def test_unchanged_values_do_not_rewrite_the_file(tmp_path):
+    path = tmp_path / "article.md"
+    path.write_text(ARTICLE)
+    before = path.stat().st_ino
+
+    edit_frontmatter(path, lambda current: {"published": False})
+
+    assert path.stat().st_ino == before
+    assert path.read_text() == ARTICLE
+
+
+def test_failing_edit_leaves_the_file_untouched(tmp_path):
+    path = tmp_path / "article.md"
+    path.write_text(ARTICLE)
+
+    def edit(current):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        edit_frontmatter(path, edit)
+
+    assert path.read_text() == ARTICLE
+    assert [p.name for p in tmp_path.iterdir()] == ["article.md"]
+
+
+def test_render_header_skips_comment_and_indented_lines():
+    header = ["# published: false", "  published: false", "published: false"]
+
+    assert _render_header(header, {"published": True}).splitlines() == [
+        "---",
+        "# published: false",
+        "  published: false",
+        "published: true",
+        "---",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("raw_value", "expected"),
+    [
+        (' "a # b" # note', ' "a # b" '),
+        (" 'it''s' # note", " 'it''s' "),
+        (' "a \\" # b"', ' "a \\" # b"'),
+        (" C#", " C#"),
+        ("# only a comment", ""),
+    ],
+)
+def test_strip_comment(raw_value, expected):
+    assert _strip_comment(raw_value) == expected
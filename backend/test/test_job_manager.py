@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+from backend.models.job_model import JobModel
+from backend.session.job_manager import JobManager
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    JobModel.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _running_job(db: Session, owner: str) -> str:
+    job_manager = JobManager(db=db)
+    job_id = job_manager.create_job(kind="publish", payload={"slug": "a"}, priority=0).job_id
+    assert job_manager.claim_job(job_id=job_id, owner=owner, lease_seconds=60) is not None
+    return job_id
+
+
+def test_live_lease_is_not_reclaimed(db):
+    job_id = _running_job(db, owner="a")
+
+    assert JobManager(db=db).reclaim_expired() == []
+    assert JobManager(db=db).get_job(job_id).status == "running"
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_finish(db):
+    job_manager = JobManager(db=db)
+    job_id = _running_job(db, owner="a")
+    db.execute(update(JobModel).values(lease_expires_at=datetime.now() - timedelta(seconds=1)))
+
+    assert job_manager.reclaim_expired() == [(job_id, 0)]
+    assert job_manager.claim_job(job_id=job_id, owner="b", lease_seconds=60) is not None
+    assert not job_manager.finish_job(job_id=job_id, owner="a", result={})
+    assert job_manager.finish_job(job_id=job_id, owner="b", result={"ok": True})
+    assert job_manager.get_job(job_id).status == "succeeded"
+
+
+def test_renewed_lease_survives_reclaim(db):
+    job_manager = JobManager(db=db)
+    job_id = _running_job(db, owner="a")
+    db.execute(update(JobModel).values(lease_expires_at=datetime.now() - timedelta(seconds=1)))
+
+    assert job_manager.renew_leases(owner="a", lease_seconds=60) == 1
+    assert job_manager.reclaim_expired() == []
+    assert job_manager.get_job(job_id).status == "running"
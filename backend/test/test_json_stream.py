@@ -0,0 +1,52 @@
+import json
+from typing import Dict, Iterable, List
+import pytest
+from backend.zenn.json_stream import FieldChunk, JsonFieldStream
+
+
+def _collect(deltas: Iterable[str]) -> Dict[str, str]:
+    stream = JsonFieldStream()
+    chunks: List[FieldChunk] = []
+    for delta in deltas:
+        chunks.extend(stream.feed(delta))
+    assert stream.finished
+    values: Dict[str, str] = {}
+    for chunk in chunks:
+        values[chunk.key] = values.get(chunk.key, "") + chunk.text
+    return values
+
+
+def test_escape_split_across_deltas():
+    assert _collect(['{"content": "a\\', "nb\\u00", 'e9c"}']) == {"content": "a\nbéc"}
+
+
+def test_surrogate_pair_split_across_deltas():
+    assert _collect(['{"emoji": "\\ud83d', '\\ude00"}']) == {"emoji": "\U0001f600"}
+
+
+def test_unpaired_high_surrogate_is_replaced():
+    assert _collect(['{"text": "\\ud83dx"}']) == {"text": "�x"}
+
+
+def test_matches_json_loads_fed_one_char_at_a_time():
+    document = json.dumps({"title": 'Tips\t"quoted"', "emoji": "🚀", "content": "a\\b\nc/d"})
+    assert _collect(document) == json.loads(document)
+
+
+def test_ignores_text_around_the_object():
+    assert _collect(['```json\n{"title": "x", "count": 3}', "\n```"]) == {
+        "title": "x",
+        "count": "3",
+    }
+
+
+def test_last_chunk_of_a_value_is_marked_done():
+    stream = JsonFieldStream()
+    assert stream.feed('{"title": "ab') == [FieldChunk("title", "ab", False)]
+    assert stream.feed('c", ') == [FieldChunk("title", "c", True)]
+    assert not stream.finished
+
+
+def test_nested_values_are_rejected():
+    with pytest.raises(ValueError):
+        JsonFieldStream().feed('{"topics": ["a"]}')
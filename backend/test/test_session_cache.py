@@ -0,0 +1,46 @@
+from datetime import datetime
+from backend.schemas.assistant_schemas import WritingSession
+from backend.session.session_cache import InMemorySessionCache
+
+
+def _session(topic: str) -> WritingSession:
+    now = datetime(2025, 1, 1)
+    return WritingSession(
+        session_id="s",
+        topic=topic,
+        target_audience="beginner",
+        outline=[],
+        content={},
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_fill_after_concurrent_write_keeps_written_session():
+    cache = InMemorySessionCache(max_entries=10, max_bytes=1_000_000)
+    generation = cache.generation()  # read starts
+    cache.remember(_session("new"))  # a write commits meanwhile
+    cache.fill(_session("old"), generation)  # the read returns the older row
+    assert cache.get("s").topic == "new"
+
+
+def test_fill_after_invalidation_is_skipped():
+    cache = InMemorySessionCache(max_entries=10, max_bytes=1_000_000)
+    generation = cache.generation()
+    cache.forget("s")  # e.g. NOTIFY from another worker
+    cache.fill(_session("old"), generation)
+    assert cache.get("s") is None
+
+
+def test_fill_without_concurrent_write():
+    cache = InMemorySessionCache(max_entries=10, max_bytes=1_000_000)
+    cache.fill(_session("t"), cache.generation())
+    assert cache.get("s").topic == "t"
+
+
+def test_peek_does_not_count_hits_or_misses():
+    cache = InMemorySessionCache(max_entries=10, max_bytes=1_000_000)
+    assert cache.peek("s") is None
+    cache.remember(_session("t"))
+    assert cache.peek("s").topic == "t"
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 0)
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from backend.core.single_flight import SingleFlight
+
+
+def test_same_key_shares_one_call():
+    async def scenario():
+        flights: SingleFlight[str] = SingleFlight()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(
+            *(flights.run(slot="s", key="k", factory=factory) for _ in range(3))
+        )
+        return flights, calls, results
+
+    flights, calls, results = asyncio.run(scenario())
+
+    assert results == ["result"] * 3
+    assert calls == 1
+    assert flights.stats() == {"started": 1, "shared": 2, "superseded": 0, "running": 0}
+
+
+def test_superseded_waiter_receives_the_newer_result():
+    async def scenario():
+        flights: SingleFlight[str] = SingleFlight()
+        old_started, old_cancelled = asyncio.Event(), asyncio.Event()
+
+        async def old():
+            old_started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                old_cancelled.set()
+                raise
+            return "old"
+
+        async def new():
+            await asyncio.sleep(0.01)
+            return "new"
+
+        first = asyncio.create_task(flights.run(slot="s", key="a", factory=old))
+        await old_started.wait()
+        second = await flights.run(slot="s", key="b", factory=new)
+        return flights, await first, second, old_cancelled.is_set()
+
+    flights, first, second, old_cancelled = asyncio.run(scenario())
+
+    assert (first, second) == ("new", "new")
+    assert old_cancelled
+    assert flights.stats() == {"started": 2, "shared": 0, "superseded": 1, "running": 0}
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def scenario():
+        flights: SingleFlight[str] = SingleFlight()
+
+        async def factory():
+            await asyncio.sleep(0.01)
+            return "result"
+
+        leaving = asyncio.create_task(flights.run(slot="s", key="k", factory=factory))
+        staying = asyncio.create_task(flights.run(slot="s", key="k", factory=factory))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(scenario()) == "result"
+
+
+def test_failure_reaches_every_waiter_and_frees_the_slot():
+    async def scenario():
+        flights: SingleFlight[str] = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flights.run(slot="s", key="k", factory=failing),
+            flights.run(slot="s", key="k", factory=failing),
+            return_exceptions=True,
+        )
+        return flights, results
+
+    flights, results = asyncio.run(scenario())
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert flights.stats()["running"] == 0
@@ -0,0 +1,20 @@
+import json
+from backend.schemas.assistant_schemas import WritingSession
+from backend.services.suggest_service import build_suggestion_key
+
+with open("backend/test/test_1.json") as f:
+    WRITING_SESSION = json.load(f)["writing_session"]
+
+
+def _key(**changes) -> str:
+    # model_copy skips validation so audiences the Literal would reject still reach the key
+    writing_session = WritingSession.model_validate(WRITING_SESSION).model_copy(update=changes)
+    return build_suggestion_key(writing_session, current_section_id="1", current_content="text")
+
+
+def test_audience_whitespace_and_case_share_a_key():
+    assert _key(target_audience=" Beginner ") == _key(target_audience="beginner")
+
+
+def test_different_audience_changes_the_key():
+    assert _key(target_audience="advance") != _key(target_audience="beginner")
@@ -0,0 +1,138 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+from backend.zenn.frontmatter import read_frontmatter
+from backend.zenn.zenn_article_schemas import ArticleInfo
+
+logger = get_logger(__name__)
+
+
+class ArticleIndex:
+    """
+    slug -> path and frontmatter of every article in ARTICLE_DIR.
+
+    Adding, removing or renaming a file changes the directory mtime, which
+    triggers a rescan that only re-reads files whose own mtime changed. A
+    lookup stats just that one file, so edits made outside this process are
+    picked up without scanning the directory. A file that cannot be read or
+    decoded is indexed with empty frontmatter, so it cannot break lookups of
+    other articles.
+    """
+
+    def __init__(self, articles_dir: str | Path | None = None) -> None:
+        self._ARTICLES_DIR: Path = Path(articles_dir or settings.ARTICLE_DIR)
+        self._entries: Dict[str, Tuple[int, Path, ArticleInfo]] = {}
+        self._dir_mtime_ns: int = -1
+        self._lock = threading.Lock()
+
+    def build(self) -> None:
+        with self._lock:
+            self._dir_mtime_ns = -1
+            self._refresh()
+        logger.info("Indexed articles: count=%s", len(self._entries))
+
+    def get(self, slug: str) -> Tuple[Path, ArticleInfo] | None:
+        """Exact lookup of one article by slug"""
+
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is None:
+                self._refresh()
+                entry = self._entries.get(slug)
+                if entry is None:
+                    return None
+
+            mtime_ns, path, info = entry
+            try:
+                current_mtime_ns = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                del self._entries[slug]
+                return None
+            if current_mtime_ns != mtime_ns:
+                info = self._load(slug, path, current_mtime_ns)
+            return path, info
+
+    def get_path(self, slug: str) -> Path | None:
+        found = self.get(slug)
+        return found[0] if found else None
+
+    def get_paths(self, slugs: List[str]) -> Dict[str, Path | None]:
+        """Resolve many slugs with at most one directory rescan"""
+
+        with self._lock:
+            self._refresh()
+            paths: Dict[str, Path | None] = {}
+            for slug in slugs:
+                entry = self._entries.get(slug)
+                paths[slug] = entry[1] if entry is not None and entry[1].exists() else None
+            return paths
+
+    def list_articles(self) -> List[ArticleInfo]:
+        with self._lock:
+            self._refresh()
+            return [info for _, _, info in self._entries.values()]
+
+    def update(self, path: str | Path) -> None:
+        """Re-read one article after this process wrote it"""
+
+        path = Path(path)
+        with self._lock:
+            try:
+                self._load(path.stem, path, path.stat().st_mtime_ns)
+            except FileNotFoundError:
+                self._entries.pop(path.stem, None)
+
+    def _refresh(self) -> None:
+        try:
+            dir_mtime_ns = self._ARTICLES_DIR.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._entries.clear()
+            return
+        if dir_mtime_ns == self._dir_mtime_ns:
+            return
+
+        seen: set[str] = set()
+        with os.scandir(self._ARTICLES_DIR) as it:
+            for dir_entry in it:
+                if dir_entry.name.startswith(".") or not dir_entry.name.endswith(".md"):
+                    continue
+                slug = dir_entry.name[: -len(".md")]
+                try:
+                    mtime_ns = dir_entry.stat().st_mtime_ns
+                    known = self._entries.get(slug)
+                    if known is None or known[0] != mtime_ns:
+                        self._load(slug, Path(dir_entry.path), mtime_ns)
+                except FileNotFoundError:
+                    # removed while scanning
+                    continue
+                seen.add(slug)
+
+        for slug in self._entries.keys() - seen:
+            del self._entries[slug]
+        self._dir_mtime_ns = dir_mtime_ns
+
+    def _load(self, slug: str, path: Path, mtime_ns: int) -> ArticleInfo:
+        try:
+            fields = read_frontmatter(path)
+        except FileNotFoundError:
+            raise
+        except (OSError, ValueError) as e:
+            logger.warning("Cannot read article frontmatter: path=%s, error=%s", path, e)
+            fields = {}
+        topics = fields.get("topics")
+        info = ArticleInfo(
+            slug=slug,
+            title=str(fields.get("title", "")),
+            emoji=str(fields.get("emoji", "")),
+            type=str(fields.get("type", "")),
+            topics=topics if isinstance(topics, list) else [],
+            published=fields.get("published") is True,
+        )
+        self._entries[slug] = (mtime_ns, path, info)
+        return info
+
+
+article_index: ArticleIndex = ArticleIndex()
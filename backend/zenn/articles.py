@@ -0,0 +1,40 @@
+from typing import List
+from fastapi import APIRouter, HTTPException
+from backend.zenn.article_index import article_index
+from backend.zenn.zenn_article_schemas import ArticleInfo, BulkTopicRequest, BulkTopicResponse
+from backend.zenn.zenn_service import ZennService
+
+router = APIRouter(prefix="/articles", tags=["Articles"])
+zenn_service: ZennService = ZennService()
+
+
+@router.get("/")
+def list_articles(published: bool | None = None) -> List[ArticleInfo]:
+    """
+    List articles from the in-memory index
+
+    :param published: only published (true) or draft (false) articles when given
+    """
+    articles = article_index.list_articles()
+    if published is not None:
+        articles = [article for article in articles if article.published == published]
+    return sorted(articles, key=lambda article: article.slug)
+
+
+@router.get("/{slug}")
+def get_article(slug: str) -> ArticleInfo:
+    found = article_index.get(slug)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"Article not found for slug: {slug}")
+    return found[1]
+
+
+@router.patch("/topics")
+def edit_topics(req: BulkTopicRequest) -> BulkTopicResponse:
+    """
+    Add and remove topics of many articles at once
+
+    :param req: slug -> topics to add and to remove
+    :return: the resulting topics, or the error, of every slug
+    """
+    return BulkTopicResponse(results=zenn_service.edit_topics(edits=req.articles))
@@ -1,5 +1,7 @@
 from pathlib import Path
+from backend.core.metrics import FILE_IO_BYTES, FILE_IO_SECONDS, observe
 from backend.core.settings import settings
+from backend.zenn.article_index import article_index
 
 
 class FileService:
@@ -12,20 +14,18 @@ class FileService:
 
         file_path = self._ARTICLES_DIR / f"{slug}.md"
 
-        with open(file_path, "w") as f:
+        with observe(FILE_IO_SECONDS, operation="article_save"), open(file_path, "w") as f:
             f.write(content)
+        FILE_IO_BYTES.labels(operation="article_save").inc(len(content.encode("utf-8")))
+        article_index.update(file_path)
 
         return str(file_path)
 
     def get_article_path(self, article_slug: str) -> Path:
-        exact_path = self._ARTICLES_DIR / f"{article_slug}.md"
-        if exact_path.exists():
-            return exact_path
-
-        candidates = list(self._ARTICLES_DIR.glob(f"*{article_slug}*.md"))
-        if not candidates:
+        article_path = article_index.get_path(article_slug)
+        if article_path is None:
             raise FileNotFoundError(f"Article not found for slug: {article_slug}")
-        return candidates[0]
+        return article_path
 
     def get_article_slug(self, article_path: str | Path) -> str:
         article_slug: str = Path(article_path).stem
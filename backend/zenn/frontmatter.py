@@ -0,0 +1,238 @@
+"""
+Reader and editor for the frontmatter Zenn articles use.
+
+Only the flat subset written by zenn-cli is supported: ``key: value`` lines
+with quoted or bare strings, booleans and inline ``[a, "b"]`` lists.
+
+Files are read up to the closing delimiter only. Edits rewrite the header
+lines they change, stream the body across unchanged into a temporary file
+and rename it over the article, so readers see the old or the new article,
+never a half-written one.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Mapping, Tuple
+from backend.core.metrics import FILE_IO_BYTES, FILE_IO_SECONDS, observe
+
+DELIMITER = "---"
+
+FrontmatterEdit = Callable[[Dict[str, Any]], Mapping[str, Any]]
+
+_path_locks: Dict[Path, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def split_frontmatter(text: str) -> Tuple[str, str] | None:
+    """Return (header, body) of an article, or None when it has no frontmatter"""
+
+    if not text.startswith(DELIMITER):
+        return None
+    end = text.find(f"\n{DELIMITER}", len(DELIMITER))
+    if end == -1:
+        return None
+    header = text[len(DELIMITER) : end].strip("\n")
+    body = text[end + len(DELIMITER) + 1 :]
+    return header, body
+
+
+def parse_frontmatter(text: str) -> Dict[str, Any]:
+    """Parse the frontmatter of an article into a dict, empty when there is none"""
+
+    parts = split_frontmatter(text)
+    if parts is None:
+        return {}
+    return _parse_lines(parts[0].splitlines())
+
+
+def read_frontmatter(path: str | Path) -> Dict[str, Any]:
+    """Parse the frontmatter of an article file without reading its body"""
+
+    with observe(FILE_IO_SECONDS, operation="frontmatter_read"), open(path, "rb") as f:
+        header = _read_header(f)
+        FILE_IO_BYTES.labels(operation="frontmatter_read").inc(f.tell())
+    return _parse_lines(header) if header is not None else {}
+
+
+def edit_frontmatter(path: str | Path, edit: FrontmatterEdit) -> Dict[str, Any]:
+    """
+    Apply a batch of field changes to an article in one atomic rewrite.
+
+    edit receives the current fields and returns the fields to set; it runs
+    under a per-file lock, so read-modify-write edits of one process do not
+    lose each other's changes, and raising from it leaves the file untouched.
+    Returns the fields after the edit. Nothing is written when no value changes.
+    """
+
+    path = Path(path)
+    with _locked(path), open(path, "rb") as f:
+        header = _read_header(f)
+        if header is None:
+            raise ValueError("front matter が存在しません")
+
+        fields = _parse_lines(header)
+        changes = {key: value for key, value in edit(fields).items() if fields.get(key) != value}
+        if not changes:
+            return fields
+
+        _replace(path, _render_header(header, changes), body=f)
+    return {**fields, **changes}
+
+
+def update_frontmatter(path: str | Path, changes: Mapping[str, Any]) -> Dict[str, Any]:
+    return edit_frontmatter(path, lambda _: changes)
+
+
+def replace_body(path: str | Path, body: str) -> None:
+    """Keep the frontmatter of an article and replace everything after it"""
+
+    path = Path(path)
+    with _locked(path):
+        with open(path, "rb") as f:
+            header = _read_header(f)
+        if header is None:
+            raise ValueError("Frontmatter not found")
+        _replace(path, _render_header(header, {}) + "\n" + body)
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return json.dumps([str(item) for item in value], ensure_ascii=False)
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def _read_header(f: BinaryIO) -> List[str] | None:
+    """Read header lines up to the closing delimiter, leaving f at the start of the body"""
+
+    if not f.readline().startswith(DELIMITER.encode()):
+        return None
+    header: List[str] = []
+    for raw_line in iter(f.readline, b""):
+        if raw_line.startswith(DELIMITER.encode()):
+            return header
+        header.append(raw_line.decode("utf-8").rstrip("\r\n"))
+    return None
+
+
+def _parse_lines(lines: List[str]) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {}
+    for line in lines:
+        key, sep, raw_value = line.partition(":")
+        if not sep or not key.strip() or key.startswith((" ", "#")):
+            continue
+        fields[key.strip()] = parse_value(raw_value)
+    return fields
+
+
+def _render_header(header: List[str], changes: Mapping[str, Any]) -> str:
+    """Rewrite the lines of changed keys in place, keeping their comments"""
+
+    pending = dict(changes)
+    lines: List[str] = [DELIMITER]
+    for line in header:
+        key, sep, raw_value = line.partition(":")
+        if sep and key.strip() in pending and not key.startswith((" ", "#")):
+            comment = raw_value[len(_strip_comment(raw_value)) :]
+            value = format_value(pending.pop(key.strip()))
+            line = f"{key}: {value}" + (f" {comment.lstrip()}" if comment else "")
+        lines.append(line)
+    lines.extend(f"{key}: {format_value(value)}" for key, value in pending.items())
+    lines.append(DELIMITER)
+    return "\n".join(lines) + "\n"
+
+
+def _replace(path: Path, header: str, body: BinaryIO | None = None) -> None:
+    """Write header (+ the rest of body) to a temp file and rename it over path"""
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".frontmatter-", suffix=".md")
+    try:
+        with observe(FILE_IO_SECONDS, operation="frontmatter_write"):
+            os.fchmod(fd, os.stat(path).st_mode & 0o777)
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(header.encode("utf-8"))
+                if body is not None:
+                    shutil.copyfileobj(body, tmp)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+                FILE_IO_BYTES.labels(operation="frontmatter_write").inc(tmp.tell())
+            os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    key = path.resolve()
+    with _path_locks_guard:
+        lock = _path_locks.setdefault(key, threading.Lock())
+    with lock:
+        yield
+
+
+def parse_value(raw_value: str) -> Any:
+    value = _strip_comment(raw_value).strip()
+    if value.startswith("[") and value.endswith("]"):
+        return _parse_list(value[1:-1])
+    if value in ("true", "false"):
+        return value == "true"
+    return _unquote(value)
+
+
+def _parse_list(inner: str) -> List[str]:
+    items: List[str] = []
+    for item in _split_items(inner):
+        item = item.strip()
+        if item:
+            items.append(_unquote(item))
+    return items
+
+
+def _split_items(inner: str) -> List[str]:
+    """Split on commas that are not inside quotes"""
+
+    items: List[str] = []
+    quote: str | None = None
+    start = 0
+    for i, char in enumerate(inner):
+        if quote:
+            if char == quote and inner[i - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == ",":
+            items.append(inner[start:i])
+            start = i + 1
+    items.append(inner[start:])
+    return items
+
+
+def _strip_comment(raw_value: str) -> str:
+    quote: str | None = None
+    for i, char in enumerate(raw_value):
+        if quote:
+            if char == quote and raw_value[i - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "#" and (i == 0 or raw_value[i - 1] in " \t"):
+            return raw_value[:i]
+    return raw_value
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
@@ -1,18 +1,40 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+from openai import OpenAIError
+from backend.core.clients import ClientRegistry, client_registry
 from backend.core.logger import get_logger
 from backend.core.settings import settings
+from backend.core.tracing import set_attributes, set_error, set_llm_attributes, stream_span, traced
 from backend.exceptions.exceptions import GenerateException
 from requests.exceptions import Timeout
-from backend.zenn.zenn_article_schemas import GeneratedResponse, GenerateRequest
+from backend.zenn.article_index import article_index
+from backend.zenn.json_stream import JsonFieldStream
+from backend.zenn.scaffold_service import ArticleDraft
+from backend.zenn.zenn_article_schemas import (
+    AIGenerateRequest,
+    AIPrompt,
+    ArticleField,
+    GeneratedResponse,
+    GenerateRequest,
+    GenerateStreamEvent,
+)
 from backend.zenn.zenn_service import ZennService
 
 logger = get_logger(__name__)
 
+OPENAI_MODEL = "gpt-5-nano"
+METADATA_FIELDS = ("title", "emoji", "type")
+
 
 class GenerateService:
-    def __init__(self) -> None:
+    def __init__(self, clients: ClientRegistry = client_registry) -> None:
         self._settings = settings
+        self._clients: ClientRegistry = clients
         self._zenn_srevice: ZennService = ZennService()
 
+    @traced("generate_service.generate_article")
     def generate_article(self, article_info: GenerateRequest) -> GeneratedResponse:
         """
         Docstring for generate_article
@@ -46,6 +68,7 @@ class GenerateService:
             status=article_response.status, slug=article_response.slug
         )
 
+        set_attributes(slug=generate_article.slug)
         logger.info(
             f"Article generated successfully."
             f"slug: {generate_article.slug},"
@@ -53,3 +76,219 @@ class GenerateService:
         )
 
         return generate_article
+
+    @traced("generate_service.generate_openai")
+    def generate_openai(self, req: AIGenerateRequest) -> GeneratedResponse:
+        """
+        Generate an article with OpenAI and save it
+
+        :param req: Prompt for the article
+        :type req: AIGenerateRequest
+        :return: Status and slug of the saved article
+        :rtype: GeneratedResponse
+        """
+        ai_prompt: AIPrompt = AIPrompt(prompt=req.prompt)
+        _prompt = _build_prompt(req=ai_prompt)
+
+        response = self._clients.openai.responses.create(model=OPENAI_MODEL, input=_prompt)
+        set_llm_attributes(None, OPENAI_MODEL, response.status, response.usage)
+
+        response_content = response.output_text
+        parsed_json = json.loads(response_content)
+
+        article_title = parsed_json.get("title", "")
+        article_emoji = parsed_json.get("emoji", "")
+        article_type = parsed_json.get("type", "")
+        article_content = parsed_json.get("content", "")
+
+        generate_request: GenerateRequest = GenerateRequest(
+            title=article_title,
+            emoji=article_emoji,
+            type=article_type,
+            content=article_content,
+        )
+
+        return self.generate_article(article_info=generate_request)
+
+    async def stream_openai(self, req: AIGenerateRequest) -> AsyncIterator[GenerateStreamEvent]:
+        """
+        Stream an OpenAI generated article to disk while it is being generated
+
+        title, emoji and type come first in the JSON (see _build_prompt), so the
+        article file is opened when the content starts and every piece of the body
+        is appended to it and sent as a content event as soon as it is decoded.
+        Once the body is complete, anything malformed after it is ignored.
+
+        :param req: Prompt for the article
+        :type req: AIGenerateRequest
+        :return: field / started / content events, then done or error
+        :rtype: AsyncIterator[GenerateStreamEvent]
+        """
+        _prompt = _build_prompt(req=AIPrompt(prompt=req.prompt))
+
+        parser = JsonFieldStream()
+        fields: Dict[str, str] = {name: "" for name in METADATA_FIELDS}
+        completed: set[str] = set()
+        early_content: List[str] = []  # only used if content comes before the metadata
+        draft: ArticleDraft | None = None
+        article_path: Path | None = None
+
+        with stream_span("generate_service.stream_openai") as span:
+            set_llm_attributes(span, OPENAI_MODEL)
+            try:
+                stream = await self._clients.async_openai.responses.create(
+                    model=OPENAI_MODEL, input=_prompt, stream=True
+                )
+                async with stream:
+                    async for event in stream:
+                        if event.type in ("response.failed", "response.incomplete", "error"):
+                            raise GenerateException(
+                                message=f"OpenAI stream ended with {event.type}",
+                                endpoint="/generate/openai/stream",
+                            )
+                        if event.type != "response.output_text.delta":
+                            continue
+
+                        for chunk in parser.feed(event.delta):
+                            if chunk.done:
+                                completed.add(chunk.key)
+                            if chunk.key in fields:
+                                fields[chunk.key] += chunk.text
+                                if chunk.done:
+                                    yield GenerateStreamEvent(
+                                        event="field",
+                                        data=ArticleField(name=chunk.key, value=fields[chunk.key]),
+                                    )
+                            elif chunk.key == "content":
+                                if draft is None and completed.issuperset(METADATA_FIELDS):
+                                    draft = self._open_draft(fields)
+                                    yield GenerateStreamEvent(event="started")
+                                if draft is None:
+                                    early_content.append(chunk.text)
+                                    continue
+                                draft.write(chunk.text)
+                                if chunk.text:
+                                    yield GenerateStreamEvent(event="content", data=chunk.text)
+                        if completed.issuperset(("content", *METADATA_FIELDS)):
+                            # the article is complete, anything the model adds is not needed
+                            break
+
+                if "content" not in completed:
+                    raise GenerateException(
+                        message="Generation ended before the article body was complete",
+                        endpoint="/generate/openai/stream",
+                    )
+                if draft is None:
+                    draft = self._open_draft(fields)
+                    draft.write("".join(early_content))
+                article_path = await asyncio.to_thread(draft.commit)
+                article_index.update(article_path)
+
+                logger.info("Streamed article generated: slug=%s", article_path.stem)
+                set_attributes(span, slug=article_path.stem)
+                yield GenerateStreamEvent(
+                    event="done",
+                    data=GeneratedResponse(status="success", slug=article_path.stem),
+                )
+            except GenerateException as e:
+                logger.error("Article stream failed: %s", e.message)
+                set_error(span, e.message)
+                yield GenerateStreamEvent(event="error", data=e.message)
+            except (OpenAIError, ValueError) as e:
+                logger.exception("Article stream failed")
+                span.record_exception(e)
+                set_error(span, f"{type(e).__name__}: {e}")
+                yield GenerateStreamEvent(event="error", data=f"{type(e).__name__}: {e}")
+            finally:
+                # client went away or the generation failed: drop the unfinished file
+                if draft is not None and article_path is None:
+                    draft.discard()
+
+    def _open_draft(self, fields: Dict[str, str]) -> ArticleDraft:
+        return self._zenn_srevice.scaffold_service.open_article(
+            title=fields["title"],
+            emoji=fields["emoji"],
+            type=fields["type"],
+        )
+
+
+def _build_prompt(req: AIPrompt) -> str:
+    _prompt = f"""
+    You are a professional technical writer for Zenn.
+
+    Write a high-quality technical article in Japanese based on the title below,
+    and output ONLY a JSON object with the required fields.
+
+    # Input Title
+    {req.prompt}
+
+    # Requirements for the article
+    - Write in Markdown format
+    - Structure: 導入 → 背景 → 手順 → まとめ
+    - Use appropriate Markdown headers (##, ###)
+    - Include code examples when appropriate (use ```言語名 syntax)
+    - Use です・ます調 formal style
+    - Article content must be long and detailed
+
+    # Output format requirements
+    - Output MUST be ONLY a valid JSON object
+    - NO explanation, NO surrounding text, NO backticks, NO markdown fences
+    - All values must be strings
+    - Key order must be exactly as below
+
+    # JSON Format Example
+    {{
+    "title": "hogehoge",
+    "emoji": "hoge",
+    "type": "article type ["Tech" or "Idea"],
+    "content": "this is the content of article"
+    }}
+
+    # 📝 Hint — If You’re Struggling to Choose a Title
+
+    ## How to Create Effective Blog Titles
+
+    This guide explains **why blog titles are important** and 
+    the **key methods for choosing strong titles**.
+
+    ---
+
+    ### 🎯 What a Good Title Should Achieve
+    - Clearly communicates what the article is about
+    - Stands out and competes with other articles
+
+    ---
+
+    ### 🪄 Tips for Writing Effective Blog Titles
+    1. Match the title with the article’s content
+    2. Use proven title formats or templates
+    3. Keep it around **30 full-width characters** (≈ **15–18 English words**)
+    4. Include important target keywords
+
+    > These four points help you create titles that attract more 
+    readers and improve article performance.
+
+    ---
+
+    ## 🤔 Unsure How to Choose the Article Type? (Tech or Idea)
+
+    | Type | Choose this when… |
+    |-------|----------------|
+    | **Tech** | The article covers software, hardware, hands-on testing, implementation results,
+    or technical insights from real experience |
+    | **Idea** | The article covers careers, management, abstract thinking about technology,
+    or information summaries not directly tied to technical implementation |
+
+    ---
+
+    Use these hints to choose the most suitable **title** and **type**, 
+    and create content that reaches the right audience.
+
+    # Output ONLY a valid JSON object.
+    Do not include explanations, markdown, or code fences.
+
+    # Finally Write this "この記事はAIによって作成されました。"
+
+    """
+
+    return _prompt
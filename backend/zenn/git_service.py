@@ -0,0 +1,141 @@
+import hashlib
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+from backend.core.metrics import SUBPROCESS_SECONDS, observe
+from backend.core.settings import settings
+from backend.core.tracing import set_attributes, traced, tracer
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Repository(NamedTuple):
+    toplevel: str
+    object_format: str
+    committer: str  # "Name <email>"
+
+
+class GitService:
+    """
+    Commit given files with git plumbing instead of `git add .` and `git commit`.
+
+    One `git fast-import` writes the blobs, the tree and the commit and moves
+    the branch; `git update-index --index-info` then records the same blobs in
+    the index. Neither looks at the rest of the working tree, so the cost
+    depends on the number of committed files, not on the repository size.
+
+    The toplevel, object format and committer identity are looked up once
+    per process and root dir, so a commit runs rev-parse (branch and HEAD),
+    ls-tree (blobs in HEAD), fast-import and update-index.
+    """
+
+    _repositories: Dict[Path, _Repository] = {}
+    _repositories_lock = threading.Lock()
+
+    def __init__(self, root_dir: str | Path | None = None) -> None:
+        self._ROOT_DIR: Path = Path(root_dir or settings.ROOT_DIR)
+
+    @traced("git_service.commit_paths")
+    def commit_paths(self, paths: List[Path], message: str) -> str | None:
+        """Commit the current content of paths on top of HEAD, None when nothing changed"""
+
+        set_attributes(paths=len(paths))
+
+        repository = self._repository()
+        head, branch = self._git(["rev-parse", "HEAD", "--symbolic-full-name", "HEAD"]).split()
+        if not branch.startswith("refs/heads/"):
+            raise ValueError("Cannot publish from a detached HEAD")
+
+        contents: Dict[str, bytes] = {}
+        for path in paths:
+            relative = path.resolve().relative_to(repository.toplevel).as_posix()
+            contents[relative] = path.read_bytes()
+        blobs = {
+            relative: self._blob_id(content, repository.object_format)
+            for relative, content in contents.items()
+        }
+
+        if blobs == self._tree_blobs(head, list(blobs)):
+            logger.info("Nothing to commit: paths=%s", list(blobs))
+            return None
+
+        commit = self._fast_import(branch, head, message, contents, repository.committer)
+        # keep the index in sync, or `git status` would show the commit reverted
+        self._git(
+            ["update-index", "--add", "--index-info"],
+            input="".join(f"100644 {blob}\t{relative}\n" for relative, blob in blobs.items()),
+        )
+        logger.info("Committed %s files: commit=%s", len(blobs), commit)
+        set_attributes(commit=commit)
+        return commit
+
+    def push(self) -> None:
+        self._git(["push"])
+
+    def _fast_import(
+        self, branch: str, head: str, message: str, contents: Dict[str, bytes], committer: str
+    ) -> str:
+        encoded_message = message.encode("utf-8")
+        stream = bytearray()
+        stream += f"commit {branch}\nmark :1\ncommitter {committer} now\n".encode()
+        stream += b"data %d\n%s\n" % (len(encoded_message), encoded_message)
+        stream += f"from {head}\n".encode()
+        for relative, content in contents.items():
+            stream += f"M 100644 inline {relative}\n".encode("utf-8")
+            stream += b"data %d\n%s\n" % (len(content), content)
+        stream += b"get-mark :1\ndone\n"
+
+        with (
+            tracer.start_as_current_span("git fast-import"),
+            observe(SUBPROCESS_SECONDS, command="git fast-import"),
+        ):
+            completed = subprocess.run(
+                ["git", "fast-import", "--quiet", "--done", "--date-format=now"],
+                cwd=str(self._ROOT_DIR),
+                input=bytes(stream),
+                check=True,
+                capture_output=True,
+            )
+        return completed.stdout.decode().strip()
+
+    def _tree_blobs(self, head: str, paths: List[str]) -> Dict[str, str]:
+        output = self._git(["ls-tree", "-z", head, "--", *paths])
+        blobs: Dict[str, str] = {}
+        for entry in filter(None, output.split("\0")):
+            meta, relative = entry.split("\t", 1)
+            blobs[relative] = meta.split()[2]
+        return blobs
+
+    def _blob_id(self, content: bytes, object_format: str) -> str:
+        digest = hashlib.sha256 if object_format == "sha256" else hashlib.sha1
+        return digest(b"blob %d\0" % len(content) + content).hexdigest()
+
+    def _repository(self) -> _Repository:
+        with self._repositories_lock:
+            repository = self._repositories.get(self._ROOT_DIR)
+            if repository is None:
+                toplevel, object_format = self._git(
+                    ["rev-parse", "--show-toplevel", "--show-object-format"]
+                ).splitlines()
+                # "Name <email> timestamp tz"; fast-import wants only "Name <email>"
+                ident = self._git(["var", "GIT_COMMITTER_IDENT"]).strip()
+                repository = _Repository(toplevel, object_format, ident.rsplit(" ", 2)[0])
+                self._repositories[self._ROOT_DIR] = repository
+            return repository
+
+    def _git(self, args: List[str], input: str | None = None) -> str:
+        with (
+            tracer.start_as_current_span(f"git {args[0]}"),
+            observe(SUBPROCESS_SECONDS, command=f"git {args[0]}"),
+        ):
+            completed = subprocess.run(
+                ["git", *args],
+                cwd=str(self._ROOT_DIR),
+                input=input,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        return completed.stdout
@@ -0,0 +1,169 @@
+"""
+Incremental parser for the flat JSON object the article generator returns.
+
+Text is fed in arbitrary chunks, e.g. deltas of a streamed model response, and
+string values are handed back piece by piece as soon as they are decoded, so a
+long ``content`` never has to be held in memory. Anything before the opening
+brace (a stray code fence) and after the closing brace is ignored.
+"""
+
+import re
+from typing import List, NamedTuple
+
+_WHITESPACE = " \t\r\n"
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class FieldChunk(NamedTuple):
+    key: str
+    text: str
+    done: bool  # True on the last chunk of a value
+
+
+class JsonFieldStream:
+    """Push parser yielding FieldChunk for each top-level value of a JSON object"""
+
+    def __init__(self) -> None:
+        self._state = "object"
+        self._key: List[str] = []
+        self._current_key = ""
+        self._scalar: List[str] = []
+        self._escape: str | None = None  # pending escape sequence, without the backslash
+        self._high_surrogate: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self._state == "end"
+
+    def feed(self, text: str) -> List[FieldChunk]:
+        chunks: List[FieldChunk] = []
+        i = 0
+        while i < len(text):
+            state = self._state
+            if state == "string":
+                i = self._read_string(text, i, chunks)
+                continue
+
+            char = text[i]
+            i += 1
+            if state == "object":
+                if char == "{":
+                    self._state = "key_or_end"
+            elif state == "key_string":
+                if char == '"':
+                    self._current_key = "".join(self._key)
+                    self._state = "colon"
+                else:
+                    self._key.append(char)
+            elif state == "end" or char in _WHITESPACE and state != "scalar":
+                continue
+            elif state in ("key_or_end", "key"):
+                if char == '"':
+                    self._key = []
+                    self._state = "key_string"
+                elif char == "}" and state == "key_or_end":
+                    self._state = "end"
+                else:
+                    raise ValueError(f"Expected a key, got {char!r}")
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':', got {char!r}")
+                self._state = "value"
+            elif state == "value":
+                if char == '"':
+                    self._state = "string"
+                elif char in "{[":
+                    raise ValueError(f"Nested values are not supported: {self._current_key}")
+                else:
+                    self._scalar = [char]
+                    self._state = "scalar"
+            elif state == "scalar":
+                if char in ",}" or char in _WHITESPACE:
+                    chunks.append(FieldChunk(self._current_key, "".join(self._scalar), True))
+                    self._state = "after_value"
+                    i -= 1
+                else:
+                    self._scalar.append(char)
+            elif state == "after_value":
+                if char == ",":
+                    self._state = "key"
+                elif char == "}":
+                    self._state = "end"
+                else:
+                    raise ValueError(f"Expected ',' or '}}', got {char!r}")
+        return chunks
+
+    def _read_string(self, text: str, i: int, chunks: List[FieldChunk]) -> int:
+        """Decode string content from text[i:], return the index to continue from"""
+
+        decoded: List[str] = []
+        while i < len(text):
+            if self._escape is not None:
+                i = self._read_escape(text, i, decoded)
+                continue
+
+            match = _STRING_SPECIAL.search(text, i)
+            end = match.start() if match else len(text)
+            if end > i:
+                decoded.append(self._flush_surrogate() + text[i:end])
+            if match is None:
+                i = end
+                break
+            i = end + 1
+            if match.group() == "\\":
+                self._escape = ""
+                continue
+
+            decoded.append(self._flush_surrogate())
+            chunks.append(FieldChunk(self._current_key, "".join(decoded), True))
+            self._state = "after_value"
+            return i
+
+        if decoded:
+            chunks.append(FieldChunk(self._current_key, "".join(decoded), False))
+        return i
+
+    def _read_escape(self, text: str, i: int, decoded: List[str]) -> int:
+        assert self._escape is not None
+        if not self._escape:
+            char = text[i]
+            if char != "u":
+                self._escape = None
+                # leave an unknown escape as it was written instead of failing the article
+                decoded.append(self._flush_surrogate() + _ESCAPES.get(char, "\\" + char))
+                return i + 1
+            self._escape = "u"
+            i += 1
+
+        needed = 5 - len(self._escape)
+        self._escape += text[i : i + needed]
+        i += min(needed, len(text) - i)
+        if len(self._escape) < 5:
+            return i
+
+        hex_digits, self._escape = self._escape[1:], None
+        try:
+            code = int(hex_digits, 16)
+        except ValueError:
+            decoded.append(self._flush_surrogate() + "\\u" + hex_digits)
+            return i
+
+        if 0xD800 <= code <= 0xDBFF:
+            decoded.append(self._flush_surrogate())
+            self._high_surrogate = chr(code)
+        elif 0xDC00 <= code <= 0xDFFF and self._high_surrogate:
+            pair = self._high_surrogate + chr(code)
+            self._high_surrogate = None
+            decoded.append(pair.encode("utf-16", "surrogatepass").decode("utf-16"))
+        else:
+            decoded.append(self._flush_surrogate() + chr(code))
+        return i
+
+    def _flush_surrogate(self) -> str:
+        """A high surrogate not followed by a low one is replaced, like errors="replace" """
+
+        if self._high_surrogate is None:
+            return ""
+        self._high_surrogate = None
+        return "�"
@@ -1,6 +1,11 @@
 from backend.exceptions.exceptions import PublishException
 from fastapi import APIRouter, HTTPException
-from backend.zenn.zenn_article_schemas import PublishRequest, PublishResponse
+from backend.zenn.zenn_article_schemas import (
+    PublishBatchRequest,
+    PublishBatchResponse,
+    PublishRequest,
+    PublishResponse,
+)
 from backend.zenn.publish_service import PublishService
 
 router = APIRouter(prefix="/publish", tags=["Publish"])
@@ -31,3 +36,28 @@ def publish(req: PublishRequest) -> PublishResponse:
                 "endpoint": e.endpoint,
             },
         ) from e
+
+
+@router.post("/batch")
+def publish_batch(req: PublishBatchRequest) -> PublishBatchResponse:
+    """
+    Publish several articles with a single commit and a single push
+
+    :param req: Publish request containing the slugs to publish
+    :type req: PublishBatchRequest
+    :return: {"status": ["published!" or "failed"], "commit": str | None, "results": [...]}
+    :rtype: PublishBatchResponse
+    :raises HTTPException: If git commit or push fails
+    """
+
+    try:
+        return publisher.publish_articles(req=req)
+    except PublishException as e:
+        raise HTTPException(
+            status_code=e.status_code or 500,
+            detail={
+                "error": "Kenn_Zenn API Error",
+                "message": e.message,
+                "endpoint": e.endpoint,
+            },
+        ) from e
@@ -1,7 +1,12 @@
 from backend.core.logger import get_logger
 from backend.exceptions.exceptions import PublishException
 from requests.exceptions import Timeout
-from backend.zenn.zenn_article_schemas import PublishRequest, PublishResponse
+from backend.zenn.zenn_article_schemas import (
+    PublishBatchRequest,
+    PublishBatchResponse,
+    PublishRequest,
+    PublishResponse,
+)
 from backend.zenn.zenn_service import ZennService
 
 logger = get_logger(__name__)
@@ -51,3 +56,38 @@ class PublishService:
         )
 
         return publish_article
+
+    def publish_articles(self, req: PublishBatchRequest) -> PublishBatchResponse:
+        """
+        Publish several articles with one commit and one push
+
+        :param req: Publish request containing slugs
+        :type req: PublishBatchRequest
+        :return: Commit hash and the result of every slug
+        :rtype: PublishBatchResponse
+        """
+        logger.info(f"Publishing {len(req.slugs)} articles")
+
+        try:
+            results, commit = self._zenn_srevice.publish_articles(slugs=req.slugs)
+
+        except Timeout:
+            logger.error("Request to Kenn_Zenn API timed out for batch publish")
+            raise PublishException(
+                message="Request to Kenn_Zenn API timed out",
+                endpoint="/publish/batch",
+            )
+
+        publish_response: PublishBatchResponse = PublishBatchResponse(
+            status="published!" if any(result.result for result in results) else "failed",
+            commit=commit,
+            results=results,
+        )
+
+        logger.info(
+            f"Batch publish finished."
+            f"commit: {publish_response.commit},"
+            f"published: {sum(result.result for result in results)}/{len(results)}"
+        )
+
+        return publish_response
@@ -0,0 +1,177 @@
+import json
+import os
+import secrets
+import tempfile
+from pathlib import Path
+from typing import TextIO
+from backend.core.metrics import FILE_IO_BYTES, FILE_IO_SECONDS, observe
+from backend.core.settings import settings
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+ARTICLE_TYPES = ("tech", "idea")
+
+
+class ScaffoldService:
+    """
+    `npx zenn new:article` without Node: same slug format and frontmatter.
+
+    The file is written to a temporary name and hard-linked into place, so it
+    appears complete or not at all and an existing article is never overwritten.
+    """
+
+    _SLUG_ATTEMPTS = 5
+
+    def __init__(self) -> None:
+        self._ARTICLES_DIR: Path = Path(settings.ARTICLE_DIR)
+
+    def create_article(
+        self,
+        title: str,
+        emoji: str,
+        type: str,
+        content: str,
+        published: bool = False,
+    ) -> Path:
+        """Write a new article and return its path, the slug is the file stem"""
+
+        self._ARTICLES_DIR.mkdir(parents=True, exist_ok=True)
+        text = self.render(
+            title=title, emoji=emoji, type=type, content=content, published=published
+        )
+
+        for _ in range(self._SLUG_ATTEMPTS):
+            article_path = self._ARTICLES_DIR / f"{self.generate_slug()}.md"
+            if self._write_new(article_path, text):
+                logger.info("Created article: %s", article_path.name)
+                return article_path
+
+        raise FileExistsError("Failed to find an unused article slug.")
+
+    def generate_slug(self) -> str:
+        # zenn-cli: randomBytes(7).toString("hex"), 14 chars within [0-9a-z-_]{12,50}
+        return secrets.token_hex(7)
+
+    def open_article(
+        self,
+        title: str,
+        emoji: str,
+        type: str,
+        published: bool = False,
+    ) -> "ArticleDraft":
+        """Start an article whose body is written in pieces, see ArticleDraft"""
+
+        self._ARTICLES_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self._ARTICLES_DIR, prefix=".scaffold-", suffix=".md")
+        os.fchmod(fd, 0o644)
+        file = os.fdopen(fd, "w", encoding="utf-8")
+        file.write(
+            self.render_front_matter(title=title, emoji=emoji, type=type, published=published)
+        )
+        return ArticleDraft(scaffold=self, file=file, tmp_path=Path(tmp_name))
+
+    def render(self, title: str, emoji: str, type: str, content: str, published: bool) -> str:
+        front_matter = self.render_front_matter(
+            title=title, emoji=emoji, type=type, published=published
+        )
+        return front_matter + content.strip() + "\n"
+
+    def render_front_matter(self, title: str, emoji: str, type: str, published: bool) -> str:
+        article_type = type.strip().lower()
+        if article_type not in ARTICLE_TYPES:
+            article_type = "tech"
+
+        return (
+            "---\n"
+            f"title: {json.dumps(title, ensure_ascii=False)}\n"
+            f"emoji: {json.dumps(emoji, ensure_ascii=False)}\n"
+            f'type: "{article_type}" # tech: 技術記事 / idea: アイデア\n'
+            "topics: []\n"
+            f"published: {'true' if published else 'false'}\n"
+            "---\n\n"
+        )
+
+    def _write_new(self, article_path: Path, text: str) -> bool:
+        """Atomically create article_path with text, False if it already exists"""
+
+        fd, tmp_name = tempfile.mkstemp(dir=article_path.parent, prefix=".scaffold-", suffix=".md")
+        try:
+            with observe(FILE_IO_SECONDS, operation="article_create"):
+                os.fchmod(fd, 0o644)  # mkstemp creates 0600, zenn new:article leaves 0644
+                encoded = text.encode("utf-8")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(encoded)
+                    f.flush()
+                    os.fsync(f.fileno())
+                FILE_IO_BYTES.labels(operation="article_create").inc(len(encoded))
+                return self._link_new(Path(tmp_name), article_path)
+        finally:
+            os.unlink(tmp_name)
+
+    def _link_new(self, tmp_path: Path, article_path: Path) -> bool:
+        try:
+            # link fails instead of replacing when the slug is taken
+            os.link(tmp_path, article_path)
+            return True
+        except FileExistsError:
+            return False
+
+    def _link_with_new_slug(self, tmp_path: Path) -> Path:
+        for _ in range(self._SLUG_ATTEMPTS):
+            article_path = self._ARTICLES_DIR / f"{self.generate_slug()}.md"
+            if self._link_new(tmp_path, article_path):
+                logger.info("Created article: %s", article_path.name)
+                return article_path
+
+        raise FileExistsError("Failed to find an unused article slug.")
+
+
+class ArticleDraft:
+    """
+    An article being written piece by piece, e.g. while a model streams it.
+
+    The body goes straight to a hidden temporary file next to the articles, so
+    memory stays flat however long the article gets. commit() links it into
+    place under a fresh slug; until then the article index and git never see a
+    half-written article.
+    """
+
+    def __init__(self, scaffold: ScaffoldService, file: TextIO, tmp_path: Path) -> None:
+        self._scaffold = scaffold
+        self._file = file
+        self._tmp_path = tmp_path
+        self._started = False
+        self._pending_whitespace = ""  # held back so the body ends like content.strip()
+
+    def write(self, text: str) -> None:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started = True
+
+        body = text.rstrip()
+        if not body:
+            self._pending_whitespace += text
+            return
+        self._file.write(self._pending_whitespace + body)
+        self._pending_whitespace = text[len(body) :]
+
+    def commit(self) -> Path:
+        """Finish the file and move it into place, returning the article path"""
+
+        try:
+            with observe(FILE_IO_SECONDS, operation="article_stream_commit"):
+                self._file.write("\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                FILE_IO_BYTES.labels(operation="article_stream").inc(self._file.tell())
+                self._file.close()
+                return self._scaffold._link_with_new_slug(self._tmp_path)
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Dict, List, Literal
 
 from pydantic import BaseModel
 
@@ -19,6 +19,17 @@ class GeneratedResponse(BaseModel):
     slug: str
 
 
+class ArticleField(BaseModel):
+    name: Literal["title", "emoji", "type"]
+    value: str
+
+
+class GenerateStreamEvent(BaseModel):
+    # started: the body began and is being written to disk; content: a piece of the body
+    event: Literal["field", "started", "content", "done", "error"]
+    data: ArticleField | GeneratedResponse | str | None = None
+
+
 class AIPrompt(BaseModel):
     prompt: str
 
@@ -35,3 +46,44 @@ class PublishResponse(BaseModel):
 class PublishResult(BaseModel):
     result: bool
     slug: str
+    title: str | None = None
+    error: str | None = None
+
+
+class PublishBatchRequest(BaseModel):
+    slugs: List[str]
+
+
+class PublishBatchResponse(BaseModel):
+    status: Literal["published!", "failed"]
+    commit: str | None  # None when no article changed
+    results: List[PublishResult]
+
+
+class TopicEdit(BaseModel):
+    add: List[str] = []
+    remove: List[str] = []
+
+
+class BulkTopicRequest(BaseModel):
+    articles: Dict[str, TopicEdit]  # slug -> topics to add / remove
+
+
+class TopicResult(BaseModel):
+    slug: str
+    result: bool
+    topics: List[str] | None = None  # topics after the edit
+    error: str | None = None
+
+
+class BulkTopicResponse(BaseModel):
+    results: List[TopicResult]
+
+
+class ArticleInfo(BaseModel):
+    slug: str
+    title: str
+    emoji: str
+    type: str
+    topics: List[str]
+    published: bool
@@ -1,12 +1,19 @@
-import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, NoReturn, Tuple
+from backend.core.metrics import SUBPROCESS_SECONDS, command_label, observe
 from backend.core.settings import settings
+from backend.core.tracing import set_attributes, traced, tracer
 from backend.zenn.file_service import FileService
+from backend.zenn.scaffold_service import ScaffoldService
+from backend.zenn.article_index import article_index
+from backend.zenn.frontmatter import edit_frontmatter, replace_body
+from backend.zenn.git_service import GitService
 from fastapi import HTTPException
 from backend.zenn.zenn_article_schemas import GenerateRequest, GeneratedResponse
-from backend.zenn.zenn_article_schemas import PublishResponse
+from backend.zenn.zenn_article_schemas import PublishResponse, PublishResult
+from backend.zenn.zenn_article_schemas import TopicEdit, TopicResult
 from backend.exceptions.exceptions import UntitleException
 
 
@@ -16,8 +23,33 @@ class ZennService:
         self._ROOT_DIR: Path = Path(self._settings.ROOT_DIR)
         self._ARTICLES_DIR: Path = Path(self._settings.ARTICLE_DIR)
         self.file_service = FileService()
+        self.scaffold_service = ScaffoldService()
+        self.git_service = GitService(root_dir=self._ROOT_DIR)
 
+    @traced("zenn_service.generate_article")
     def generate_article(self, article_info: GenerateRequest) -> GeneratedResponse:
+        """
+        新規記事を作成し, 自動生成された md の slug(id)を返却する.
+        ZENN_SCAFFOLD_MODE=npx の場合は Zenn CLI で作成する.
+        """
+
+        set_attributes(scaffold_mode=self._settings.ZENN_SCAFFOLD_MODE)
+        if self._settings.ZENN_SCAFFOLD_MODE == "npx":
+            return self._generate_article_with_cli(article_info=article_info)
+
+        article_path: Path = self.scaffold_service.create_article(
+            title=article_info.title,
+            emoji=article_info.emoji,
+            type=article_info.type,
+            content=article_info.content,
+        )
+        article_index.update(article_path)
+        return GeneratedResponse(
+            status="success",
+            slug=self.file_service.get_article_slug(article_path=article_path),
+        )
+
+    def _generate_article_with_cli(self, article_info: GenerateRequest) -> GeneratedResponse:
         """
         Zenn CLIで新規記事を作成し,
         自動生成された md の slug(id)を返却する.
@@ -64,7 +96,11 @@ class ZennService:
                 "false",
             ]
 
-        subprocess.run(cmd, cwd=str(self._ROOT_DIR), check=True)
+        with (
+            tracer.start_as_current_span(command_label(cmd)),
+            observe(SUBPROCESS_SECONDS, command=command_label(cmd)),
+        ):
+            subprocess.run(cmd, cwd=str(self._ROOT_DIR), check=True)
 
         # CLI実行後ファイル一覧
         after_files = set(self._ARTICLES_DIR.glob("*.md"))
@@ -76,23 +112,9 @@ class ZennService:
 
         article_path = new_files[0]  # 1つだけのはずなので確定
 
-        # ファイル内容を読み込み
-        with article_path.open("r") as f:
-            original = f.read()
-
-        # フロントマター部分（--- ... ---）を抽出
-        if original.startswith("---"):
-            parts = original.split("---", 2)
-            # parts = ["", frontmatter, rest]
-            front_matter = f"---{parts[1]}---\n\n"
-        else:
-            raise ValueError("Frontmatter not found")
-
-        # 本文部分をLLMの内容で上書き
-        new_content = front_matter + content.strip() + "\n"
-
-        with article_path.open("w") as f:
-            f.write(new_content)
+        # 本文部分をLLMの内容で上書き (フロントマターはCLIが書いたまま)
+        replace_body(article_path, content.strip() + "\n")
+        article_index.update(article_path)
 
         article_slug: str = self.file_service.get_article_slug(article_path=article_path)
 
@@ -110,114 +132,67 @@ class ZennService:
     ) -> GeneratedResponse:  # ToDo: topicは複数登録できるのうに改良
         article_path = self.file_service.get_article_path(article_slug=slug)
 
-        with Path(article_path).open("r") as f:
-            content = f.read()
-
-        if content.startswith("---"):
-            parts = content.split("---", 2)
-            front_matter = parts[1]
-            body = parts[2]
-
-            match = re.search(r"topics:\s*\[(.*?)\]", front_matter)
-
-            if match:
-                topic_list_str = match.group(1).strip()
-
-                if topic_list_str:
-                    topics: List[str] = [
-                        t.strip().strip('"').strip("'") for t in topic_list_str.split(",")
-                    ]
-                else:
-                    topics = []
-
-                if topic not in topics:
-                    topics.append(topic)
-
-                new_topic_str = ",".join([f'"{t}"' for t in topics])
-                new_front_matter = re.sub(
-                    r"topics:\s*\[.*?\]",
-                    f"topics: [{new_topic_str}]",
-                    front_matter,
-                )
+        def _add_topic(fields: Dict[str, Any]) -> Dict[str, Any]:
+            topics = fields.get("topics")
+            if not isinstance(topics, list):
+                raise ValueError("topics: の行が見つかりません")
+            return {"topics": topics if topic in topics else [*topics, topic]}
 
-                new_content = f"---{new_front_matter}---{body}"
+        edit_frontmatter(article_path, _add_topic)
+        article_index.update(article_path)
 
-                with Path(article_path).open("w") as f:
-                    f.write(new_content)
+        article_slug: str = self.file_service.get_article_slug(article_path=article_path)
+        return GeneratedResponse(status="success", slug=article_slug)
 
-                article_slug: str = self.file_service.get_article_slug(article_path=article_path)
+    @traced("zenn_service.edit_topics")
+    def edit_topics(self, edits: Dict[str, TopicEdit]) -> List[TopicResult]:
+        """
+        複数記事の topics をまとめて追加・削除する.
+        記事ごとに1回だけ書き換え, TOPIC_EDIT_WORKERS 本のスレッドで並行に処理する.
+        """
 
-                article_response: GeneratedResponse = GeneratedResponse(
-                    status="success",
-                    slug=article_slug,
-                )
+        set_attributes(articles=len(edits))
+        paths = article_index.get_paths(list(edits))
 
-                return article_response
-            else:
-                article_response: GeneratedResponse = GeneratedResponse(
-                    status="error",
-                    slug=slug,
+        def _edit(slug: str) -> TopicResult:
+            article_path = paths[slug]
+            if article_path is None:
+                return TopicResult(slug=slug, result=False, error="Article not found")
+            try:
+                fields = edit_frontmatter(
+                    article_path, lambda fields: _apply_topic_edit(fields, edits[slug])
                 )
-                raise ValueError("topics: の行が見つかりません")
-        else:
-            article_response: GeneratedResponse = GeneratedResponse(
-                status="error",
-                slug=slug,
-            )
-            raise ValueError("front matter が存在しません")
-
+            except (OSError, ValueError) as e:
+                return TopicResult(slug=slug, result=False, error=str(e))
+            article_index.update(article_path)
+            return TopicResult(slug=slug, result=True, topics=fields["topics"])
+
+        with ThreadPoolExecutor(
+            max_workers=min(self._settings.TOPIC_EDIT_WORKERS, len(edits) or 1),
+            thread_name_prefix="topic-edit",
+        ) as executor:
+            return list(executor.map(_edit, edits))
+
+    @traced("zenn_service.publish_article")
     def publish_article(self, slug: str) -> PublishResponse:
+        set_attributes(slug=slug)
         # 対象ファイルを検索
-        md_files = list(self._ARTICLES_DIR.glob(f"*{slug}*.md"))
-        if not md_files:
+        article_path = article_index.get_path(slug)
+        if article_path is None:
             raise FileNotFoundError(f"記事が見つかりません: slug={slug}")
 
-        article_path = md_files[0]
-
         # Frontmatter 書き換え
-        with open(article_path, "r") as file:
-            content = file.read()
-
-        new_content = re.sub(r"published:\s*false", "published: true", content)
-        match_title = re.search(r'title:\s*"(.+?)"', content)
-
-        if match_title:
-            article_title = match_title.group(1)
-        else:
-            raise UntitleException(message="publishing article has no title.", endpoint="/publish")
-
-        with open(article_path, "w") as file:
-            file.write(new_content)
+        article_title: str = self._mark_published(article_path=article_path)
 
         article_slug: str = self.file_service.get_article_slug(article_path=article_path)
 
-        # Git
+        # Git: この記事だけをコミットする
         try:
-            subprocess.run(
-                ["git", "add", "."],
-                cwd=str(self._ROOT_DIR),
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            subprocess.run(
-                ["git", "commit", "-m", f"publish {article_title}"],
-                cwd=str(self._ROOT_DIR),
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            subprocess.run(
-                ["git", "push"], cwd=str(self._ROOT_DIR), check=True, capture_output=True, text=True
-            )
+            self.git_service.commit_paths(paths=[article_path], message=f"publish {article_title}")
+            self.git_service.push()
 
         except subprocess.CalledProcessError as e:
-            if "could not read Username" in e.stderr:
-                raise HTTPException(
-                    status_code=500, detail="GitHub credential missing. Configure PAT or SSH key."
-                )
-            else:
-                raise Exception(f"git_result: {e}\nstdout: {e.stdout}\nstderr: {e.stderr}")
+            self._raise_git_error(e)
 
         publish_article: PublishResponse = PublishResponse(
             status="published!",
@@ -225,3 +200,84 @@ class ZennService:
         )
 
         return publish_article
+
+    @traced("zenn_service.publish_articles")
+    def publish_articles(self, slugs: List[str]) -> Tuple[List[PublishResult], str | None]:
+        """
+        複数記事を published: true にし, 対象ファイルだけを1コミットにまとめて1回pushする.
+        slugごとの結果と作成したコミットのハッシュ(変更がなければNone)を返却する.
+        """
+
+        set_attributes(articles=len(slugs))
+        results: List[PublishResult] = []
+        published: List[Tuple[Path, str]] = []
+        for slug in dict.fromkeys(slugs):
+            article_path = article_index.get_path(slug)
+            if article_path is None:
+                results.append(PublishResult(result=False, slug=slug, error="Article not found"))
+                continue
+            try:
+                article_title = self._mark_published(article_path=article_path)
+            except UntitleException as e:
+                results.append(PublishResult(result=False, slug=slug, error=e.message))
+                continue
+            except (OSError, ValueError) as e:
+                # no frontmatter, undecodable file, ...: only this slug fails
+                results.append(PublishResult(result=False, slug=slug, error=str(e)))
+                continue
+            published.append((article_path, article_title))
+            results.append(PublishResult(result=True, slug=slug, title=article_title))
+
+        if not published:
+            return results, None
+
+        if len(published) == 1:
+            message = f"publish {published[0][1]}"
+        else:
+            message = f"publish {len(published)} articles"
+        body = "\n".join(f"- {title}" for _, title in published)
+        try:
+            commit = self.git_service.commit_paths(
+                paths=[article_path for article_path, _ in published],
+                message=f"{message}\n\n{body}",
+            )
+            # push even without a new commit: an earlier push may have failed
+            self.git_service.push()
+        except subprocess.CalledProcessError as e:
+            self._raise_git_error(e)
+
+        return results, commit
+
+    def _mark_published(self, article_path: Path) -> str:
+        """Frontmatter を published: true に書き換え, 記事タイトルを返却する"""
+
+        def _publish(fields: Dict[str, Any]) -> Dict[str, Any]:
+            if not fields.get("title"):
+                raise UntitleException(
+                    message="publishing article has no title.", endpoint="/publish"
+                )
+            return {"published": True}
+
+        fields = edit_frontmatter(article_path, _publish)
+        article_index.update(article_path)
+
+        return str(fields["title"])
+
+    def _raise_git_error(self, e: subprocess.CalledProcessError) -> NoReturn:
+        stderr = e.stderr.decode() if isinstance(e.stderr, bytes) else e.stderr or ""
+        if "could not read Username" in stderr:
+            raise HTTPException(
+                status_code=500, detail="GitHub credential missing. Configure PAT or SSH key."
+            )
+        else:
+            raise Exception(f"git_result: {e}\nstdout: {e.stdout}\nstderr: {stderr}")
+
+
+def _apply_topic_edit(fields: Dict[str, Any], topic_edit: TopicEdit) -> Dict[str, Any]:
+    topics = fields.get("topics", [])
+    if not isinstance(topics, list):
+        raise ValueError("topics が配列ではありません")
+    removed = set(topic_edit.remove)
+    new_topics = [topic for topic in topics if topic not in removed]
+    new_topics += [topic for topic in dict.fromkeys(topic_edit.add) if topic not in new_topics]
+    return {"topics": new_topics}